@@ -0,0 +1,12 @@
+"""
+Бенчмарки YaNews.
+
+Запускаются из каталога ya_news как модули, например:
+python -m benchmarks.moderation
+"""
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+django.setup()
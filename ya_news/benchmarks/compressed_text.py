@@ -0,0 +1,104 @@
+"""
+Сжатые комментарии против несжатых: размер таблицы, чтение, запись.
+
+Сжимаются текст комментария и его HTML; комментарии короче порога
+сжатия хранятся как есть, поэтому выигрыш зависит от их длины:
+python -m benchmarks.compressed_text --comments 5000 --words 10 300
+"""
+import argparse
+import random
+from contextlib import ExitStack
+from time import perf_counter
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+
+from benchmarks.utils import temporary_database
+from news.models import Comment, News
+from news.signals import bulk_comment_changes
+
+WORDS = (
+    'новость', 'город', 'погода', 'выставка', 'концерт', 'дорога',
+    'школа', 'парк', 'мост', 'транспорт', 'рынок', 'театр', 'спорт',
+)
+# Страниц в кеше SQLite при холодном чтении.
+COLD_CACHE_PAGES = 16
+COMPRESSED_FIELDS = ('text', 'text_html')
+
+
+def fill(count, words):
+    rng = random.Random(0)
+    news = News.objects.create(title='Новость', text='Текст')
+    author = get_user_model().objects.create(username='Автор')
+    comments = []
+    for _ in range(count):
+        comment = Comment(
+            news=news,
+            author=author,
+            text='\n'.join(
+                ' '.join(rng.choices(WORDS, k=10))
+                for _ in range(max(1, words // 10))
+            ),
+        )
+        comment.fill_derived_fields()
+        comments.append(comment)
+    started = perf_counter()
+    with bulk_comment_changes():
+        Comment.objects.bulk_create(comments, batch_size=500)
+    return perf_counter() - started
+
+
+def table_bytes():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name = 'news_comment'"
+        )
+        return cursor.fetchone()[0]
+
+
+def cold_read():
+    connections.close_all()
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA cache_size = {COLD_CACHE_PAGES}')
+    started = perf_counter()
+    for _ in Comment.objects.values_list(*COMPRESSED_FIELDS).iterator():
+        pass
+    return perf_counter() - started
+
+
+def measure(count, words):
+    with temporary_database():
+        write = fill(count, words)
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM')
+        return {'table': table_bytes(), 'write': write, 'read': cold_read()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--comments', type=int, default=5000)
+    parser.add_argument(
+        '--words', type=int, nargs='+', default=[10, 300],
+        help='Длина комментария в словах.',
+    )
+    args = parser.parse_args()
+    fields = [Comment._meta.get_field(name) for name in COMPRESSED_FIELDS]
+    print(f'{"слов":>5} {"хранение":<10} {"таблица, КБ":>12} '
+          f'{"запись, мс":>11} {"чтение, мс":>11}')
+    for words in args.words:
+        for label, plain in (('несжатое', True), ('zlib', False)):
+            with ExitStack() as stack:
+                if plain:
+                    for field in fields:
+                        stack.enter_context(
+                            patch.object(field, 'min_size', float('inf'))
+                        )
+                result = measure(args.comments, words)
+            print(f'{words:>5} {label:<10} {result["table"] // 1024:>12} '
+                  f'{result["write"] * 1e3:>11.1f} '
+                  f'{result["read"] * 1e3:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
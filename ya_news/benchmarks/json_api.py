@@ -0,0 +1,78 @@
+"""
+JSON API против HTML-страниц на одной и той же выборке.
+
+Размер страницы архива, API и комментариев приравнивается числу строк:
+python -m benchmarks.json_api --repeat 5
+"""
+import argparse
+from timeit import timeit
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from benchmarks.utils import temporary_database
+from news.models import Comment, News
+
+SIZES = (1_000, 10_000)
+TEXT = 'Текст новости, достаточно длинный для настоящей ленты. ' * 20
+
+
+def with_derived_fields(objects):
+    for obj in objects:
+        obj.fill_derived_fields()
+        yield obj
+
+
+def fill(size):
+    News.objects.bulk_create(with_derived_fields(
+        News(title=f'Новость {index}', text=TEXT) for index in range(size)
+    ))
+    author = get_user_model().objects.create(username='Автор')
+    news = News.objects.first()
+    Comment.objects.bulk_create(with_derived_fields(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(size)
+    ))
+    return news
+
+
+def measure(client, url, repeat):
+    assert client.get(url).status_code == 200
+    return timeit(lambda: client.get(url), number=repeat) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print(f'{"строк":>8} {"страница":<10} {"HTML, мс":>10} {"JSON, мс":>10}')
+    for size in SIZES:
+        with override_settings(
+            ALLOWED_HOSTS=['*'],
+            NEWS_COUNT_ON_ARCHIVE_PAGE=size,
+            NEWS_COUNT_ON_API_PAGE=size,
+            COMMENTS_COUNT_ON_PAGE=size,
+        ), temporary_database():
+            news = fill(size)
+            client = Client()
+            # Авторизованному клиенту страница новости не отдаётся из кеша.
+            client.force_login(get_user_model().objects.get())
+            pairs = {
+                'список': (reverse('news:archive'), reverse('news:api_list')),
+                'новость': (
+                    reverse('news:detail', args=[news.pk]),
+                    reverse('news:api_detail', args=[news.pk]),
+                ),
+            }
+            for name, (html_url, json_url) in pairs.items():
+                print(
+                    f'{size:>8} {name:<10} '
+                    f'{measure(client, html_url, args.repeat):>10.1f} '
+                    f'{measure(client, json_url, args.repeat):>10.1f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Нагрузочный прогон всех страниц YaNews на текущей базе.
+
+Сначала база заполняется командой seed, например:
+python manage.py seed --news 100000 --comments 10000000
+Затем запускается прогон, результат — JSON для сравнения запусков:
+python -m benchmarks.load --concurrency 1 4 16 --output run.json
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from benchmarks.utils import drive, peak_rss_kb
+from news import urls
+from news.models import Comment, News
+
+# Страницы, которым нужен комментарий, а не новость.
+COMMENT_URLS = {'edit', 'delete'}
+QUERY_STRINGS = {'search': '?q=город'}
+
+
+def sample_urls():
+    """
+    Адрес для каждого имени из news.urls.
+
+    Берётся новость с самым длинным обсуждением и комментарий к ней,
+    поэтому клиент входит от имени автора этого комментария.
+    """
+    news = News.objects.order_by('-comment_count').first()
+    comment = Comment.objects.filter(news=news).first()
+    if comment is None:
+        sys.exit('База пуста: сначала выполните manage.py seed.')
+    result = {}
+    for pattern in urls.urlpatterns:
+        name = pattern.name
+        args = None
+        if 'pk' in pattern.pattern.converters:
+            args = [comment.pk if name in COMMENT_URLS else news.pk]
+        result[name] = (
+            reverse(f'{urls.app_name}:{name}', args=args)
+            + QUERY_STRINGS.get(name, '')
+        )
+    return result, comment.author
+
+
+def make_clients(count, user):
+    clients = []
+    for _ in range(count):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        clients.append(client)
+    return clients
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 4, 16]
+    )
+    parser.add_argument(
+        '--requests', type=int, default=20,
+        help='Запросов на каждого клиента.',
+    )
+    parser.add_argument('--names', nargs='+', help='Только эти имена URL.')
+    parser.add_argument(
+        '--anonymous', action='store_true',
+        help='Не входить на сайт; закрытые страницы ответят редиректом.',
+    )
+    parser.add_argument('--output', help='Файл для JSON; по умолчанию stdout.')
+    args = parser.parse_args()
+    report = {
+        'project': 'ya_news',
+        'started': datetime.now(timezone.utc).isoformat(),
+        'rows': {
+            'users': get_user_model().objects.count(),
+            'news': News.objects.count(),
+            'comments': Comment.objects.count(),
+        },
+        'results': [],
+    }
+    with override_settings(ALLOWED_HOSTS=['*']):
+        targets, author = sample_urls()
+        user = None if args.anonymous else author
+        for name, url in targets.items():
+            if args.names and name not in args.names:
+                continue
+            for concurrency in args.concurrency:
+                stats = drive(
+                    make_clients(concurrency, user), url, args.requests
+                )
+                report['results'].append({
+                    'name': f'{urls.app_name}:{name}',
+                    'concurrency': concurrency,
+                    **stats,
+                })
+                print(
+                    f'{name:<12} x{concurrency:<3} '
+                    f'p50 {stats["p50_ms"]:>8.1f} мс  '
+                    f'p99 {stats["p99_ms"]:>8.1f} мс  '
+                    f'{stats["queries"]:>5.1f} запросов',
+                    file=sys.stderr,
+                )
+    report['peak_rss_kb'] = peak_rss_kb()
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Время проверки комментария в зависимости от размера словаря."""
+import random
+from timeit import timeit
+
+from news.moderation import WordMatcher, normalize
+
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+REPEAT = 200
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщъыьэюя'
+TEXT = (
+    'Отличная новость, спасибо автору! Жду продолжения и подробностей '
+    'про то, как всё это работает на практике. '
+) * 5
+
+
+def make_words(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(5, 12)))
+        for _ in range(count)
+    ]
+
+
+def naive_search(words, text):
+    """Прежний способ: поиск каждого слова через `in`."""
+    text = normalize(text)
+    return any(word in text for word in words)
+
+
+def main():
+    print(f'Длина текста: {len(TEXT)} символов, повторов: {REPEAT}')
+    print(f'{"слов":>8} {"автомат, мкс":>14} {"in, мкс":>12}')
+    for size in SIZES:
+        words = make_words(size)
+        matcher = WordMatcher(words)
+        assert matcher.search(TEXT) is None
+        automaton = timeit(lambda: matcher.search(TEXT), number=REPEAT)
+        naive = timeit(lambda: naive_search(words, TEXT), number=REPEAT)
+        print(
+            f'{size:>8} {automaton / REPEAT * 1e6:>14.1f} '
+            f'{naive / REPEAT * 1e6:>12.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Смешанная нагрузка читателей и писателей на news:detail.
+
+Сравнивает «голую» SQLite (журнал отката, новое соединение на каждый
+запрос) с профилем из SQLITE_PRAGMAS и CONN_MAX_AGE:
+python -m benchmarks.sqlite_concurrency --readers 8 --writers 4
+"""
+import argparse
+import threading
+from time import monotonic
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from benchmarks.utils import temporary_database
+from news.models import News
+
+PROFILES = {
+    'bare': ({'journal_mode': 'DELETE', 'synchronous': 'FULL'}, 0),
+    'tuned': (settings.SQLITE_PRAGMAS, 60),
+}
+
+
+def worker(client, action, deadline, stats, lock):
+    done = errors = 0
+    while monotonic() < deadline:
+        try:
+            action(client)
+            done += 1
+        except OperationalError:
+            errors += 1
+    connections.close_all()
+    with lock:
+        stats['done'] += done
+        stats['errors'] += errors
+
+
+def run_profile(pragmas, conn_max_age, readers, writers, duration):
+    with override_settings(SQLITE_PRAGMAS=pragmas, ALLOWED_HOSTS=['*']), \
+            temporary_database(CONN_MAX_AGE=conn_max_age):
+        news = News.objects.create(title='Новость', text='Текст')
+        url = reverse('news:detail', args=[news.pk])
+        users = [
+            get_user_model().objects.create(username=f'user{index}')
+            for index in range(readers + writers)
+        ]
+        clients = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+
+        def read(client):
+            client.get(url)
+
+        def write(client):
+            client.post(url, {'text': 'Комментарий'})
+
+        stats = {
+            'read': {'done': 0, 'errors': 0},
+            'write': {'done': 0, 'errors': 0},
+        }
+        lock = threading.Lock()
+        deadline = monotonic() + duration
+        threads = [
+            threading.Thread(target=worker, args=(
+                client,
+                read if index < readers else write,
+                deadline,
+                stats['read' if index < readers else 'write'],
+                lock,
+            ))
+            for index, client in enumerate(clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+    print(f'{"профиль":<8} {"чтений/с":>10} {"записей/с":>10} '
+          f'{"ошибок":>8}')
+    for name, (pragmas, conn_max_age) in PROFILES.items():
+        stats = run_profile(
+            pragmas, conn_max_age, args.readers, args.writers, args.duration
+        )
+        errors = stats['read']['errors'] + stats['write']['errors']
+        print(
+            f'{name:<8} {stats["read"]["done"] / args.duration:>10.1f} '
+            f'{stats["write"]["done"] / args.duration:>10.1f} {errors:>8}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import resource
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def temporary_database(**options):
+    """
+    Переключает базу default на временный файл SQLite с миграциями.
+
+    options дополняют настройки соединения, например CONN_MAX_AGE.
+    """
+    settings_dict = connections.databases['default']
+    saved = dict(settings_dict)
+    connections.close_all()
+    with tempfile.TemporaryDirectory() as directory:
+        settings_dict.update(
+            NAME=Path(directory) / 'benchmark.sqlite3', **options
+        )
+        try:
+            call_command('migrate', verbosity=0)
+            yield settings_dict['NAME']
+        finally:
+            connections.close_all()
+            settings_dict.clear()
+            settings_dict.update(saved)
+
+
+def percentile(values, fraction):
+    """Перцентиль по методу ближайшего ранга; values отсортированы."""
+    index = max(0, int(len(values) * fraction + 0.5) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def peak_rss_kb():
+    """Пиковый RSS процесса; в Linux ru_maxrss уже в килобайтах."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _worker(client, url, count, samples, lock):
+    local = []
+    for _ in range(count):
+        with CaptureQueriesContext(connection) as queries:
+            started = perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = perf_counter() - started
+        local.append((elapsed, len(queries), response.status_code))
+    connections.close_all()
+    with lock:
+        samples.extend(local)
+
+
+def drive(clients, url, requests):
+    """
+    Каждый клиент в своём потоке делает requests запросов к url.
+
+    Возвращает задержки в миллисекундах (p50/p95/p99), среднее число
+    SQL-запросов, долю ошибок и пропускную способность.
+    """
+    samples = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=_worker, args=(client, url, requests, samples, lock)
+        )
+        for client in clients
+    ]
+    started = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = perf_counter() - started
+    latencies = sorted(elapsed * 1e3 for elapsed, _, _ in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(status >= 400 for _, _, status in samples),
+        'rps': round(len(samples) / duration, 1),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'queries': round(
+            sum(queries for _, queries, _ in samples) / len(samples), 2
+        ),
+    }
@@ -1,10 +1,68 @@
-from datetime import datetime, timedelta
+import sqlite3
 
 import pytest
 from django.conf import settings
-from django.utils import timezone
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
 
 from news.models import Comment, News
+from news.pytest_tests.factories import make_comments, make_news, make_users
+
+# Допустимое число SQL-запросов на GET-запрос авторизованного
+# пользователя. Сессия берётся из кеша, пользователь — тоже, начиная
+# со второго запроса; здесь считается первый запрос после входа.
+QUERY_BUDGETS = {
+    'news:home': 2,
+    'news:archive': 2,
+    'news:detail': 4,
+    'news:comments': 3,
+    'news:edit': 2,
+    'news:delete': 2,
+    'news:api_list': 2,
+    'news:api_detail': 4,
+}
+
+# Объём данных в снимке базы для тестов с фикстурой seeded_db.
+SNAPSHOT_USERS = 10
+SNAPSHOT_NEWS = 100
+SNAPSHOT_COMMENTS_PER_NEWS = 50
+
+
+def copy_database(source):
+    """Копия базы SQLite в памяти через backup API."""
+    target = sqlite3.connect(':memory:', check_same_thread=False)
+    source.backup(target)
+    return target
+
+
+@pytest.fixture(scope='session', autouse=True)
+def cache_location(tmp_path_factory):
+    """Файловые кеши тестов — во временном каталоге, а не в .cache."""
+    location = tmp_path_factory.mktemp('cache')
+    with override_settings(CACHES={
+        alias: {**config, 'LOCATION': str(location / alias)}
+        for alias, config in settings.CACHES.items()
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш страниц не должен переживать откат транзакции теста."""
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+@pytest.fixture
+def assert_query_budget(django_assert_max_num_queries):
+    """Проверяет, что страница укладывается в свой бюджет запросов."""
+    def check(client, name, args=None):
+        with django_assert_max_num_queries(QUERY_BUDGETS[name]):
+            response = client.get(reverse(name, args=args))
+        return response
+    return check
 
 
 @pytest.fixture
@@ -49,27 +107,45 @@ def comment_pk(comment):
 
 @pytest.fixture
 def set_of_news():
-    News.objects.bulk_create(
-        News(
-            title=f'Новость {index}',
-            text='Текст новости',
-            date=datetime.today() - timedelta(days=index)
-        )
-        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
-    )
+    return make_news(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
 
 
 @pytest.fixture
 def set_of_comments(news, author):
-    now = timezone.now()
-    for index in range(11):
-        comment = Comment.objects.create(
-            news=news,
-            author=author,
-            text=f'Текст комментария {index}'
-        )
-        comment.created = now + timedelta(days=index)
-        comment.save()
+    return make_comments(news, [author], 11)
+
+
+@pytest.fixture(scope='session')
+def db_snapshot(django_db_setup, django_db_blocker):
+    """
+    Снимок мигрированной базы с большим набором данных.
+
+    Данные создаются один раз за сессию и копируются в памяти через
+    backup API; сама тестовая база после этого снова пуста.
+    """
+    with django_db_blocker.unblock():
+        connection.ensure_connection()
+        empty = copy_database(connection.connection)
+        users = make_users(SNAPSHOT_USERS)
+        for news in make_news(SNAPSHOT_NEWS):
+            make_comments(news, users, SNAPSHOT_COMMENTS_PER_NEWS)
+        snapshot = copy_database(connection.connection)
+        empty.backup(connection.connection)
+        empty.close()
+    yield snapshot
+    snapshot.close()
+
+
+@pytest.fixture
+def seeded_db(transactional_db, db_snapshot):
+    """
+    База — клон снимка db_snapshot.
+
+    Копирование страниц не зависит от числа строк так, как вставка;
+    после теста transactional_db очищает таблицы.
+    """
+    connection.ensure_connection()
+    db_snapshot.backup(connection.connection)
 
 
 @pytest.fixture
@@ -1,15 +1,194 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.db import transaction
+from django.db.models import Count, F
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
 
+from .cache import purge_news_pages
 from .models import Comment, News
+from .signals import bulk_comment_changes
 
+# Сколько комментариев удалять в одной транзакции.
+DELETE_CHUNK_SIZE = 500
+NEWS_FILTER = 'news__id__exact'
+# Сколько последних новостей предлагать в фильтре комментариев.
+NEWS_FILTER_CHOICES = 10
 
-class CommentInline(admin.StackedInline):
-    model = Comment
-    extra = 0
+
+def comments_url(news_pk):
+    """Список комментариев одной новости в админке."""
+    return (
+        reverse('admin:news_comment_changelist')
+        + f'?{NEWS_FILTER}={news_pk}'
+    )
 
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
-    inlines = [
-        CommentInline,
-    ]
+    """
+    Комментарии не выводятся формами на странице новости: у популярной
+    новости их слишком много. Вместо этого — ссылка на их список.
+    """
+    list_display = ('title', 'date', 'comments')
+    readonly_fields = ('comments',)
+    search_fields = ('title',)
+
+    def get_deleted_objects(self, objs, request):
+        """
+        Страница подтверждения без списка всех комментариев.
+
+        Комментарии только подсчитываются по счётчикам новостей.
+        """
+        news = list(objs)
+        comment_admin = self.admin_site._registry[Comment]
+        perms_needed = set()
+        if not comment_admin.has_delete_permission(request):
+            perms_needed.add(Comment._meta.verbose_name)
+        model_count = {
+            News._meta.verbose_name_plural: len(news),
+            Comment._meta.verbose_name_plural: sum(
+                obj.comment_count for obj in news
+            ),
+        }
+        return [str(obj) for obj in news], model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        delete_news_comments([obj.pk])
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        delete_news_comments(list(queryset.values_list('pk', flat=True)))
+        super().delete_queryset(request, queryset)
+
+    @admin.display(description='Комментарии', ordering='comment_count')
+    def comments(self, obj):
+        # Счётчик хранится в самой новости, GROUP BY по комментариям
+        # для страницы списка не нужен.
+        return format_html(
+            '<a href="{}">{}</a>', comments_url(obj.pk), obj.comment_count
+        )
+
+
+class NewsFilter(admin.SimpleListFilter):
+    """
+    Комментарии одной новости: выборка идёт по индексу
+    (news, created, id).
+
+    Предлагаются только последние новости, чтобы не загружать их все;
+    к остальным ведут ссылки со списка новостей.
+    """
+    title = 'новость'
+    parameter_name = NEWS_FILTER
+
+    def lookups(self, request, model_admin):
+        return [
+            (str(pk), title)
+            for pk, title in News.objects.order_by('-date', '-id')
+            .values_list('pk', 'title')[:NEWS_FILTER_CHOICES]
+        ]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            return queryset.filter(news_id=int(self.value()))
+        except ValueError as error:
+            raise IncorrectLookupParameters(error)
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'thread', 'author', 'created')
+    list_filter = (NewsFilter,)
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news', 'author')
+    search_fields = ('=author__username',)
+    # Общее число комментариев в таблице на каждой странице не считаем.
+    show_full_result_count = False
+    actions = ('delete_in_chunks',)
+
+    @admin.display(description='Новость', ordering='news')
+    def thread(self, obj):
+        return format_html(
+            '<a href="{}">{}</a>', comments_url(obj.news_id), obj.news
+        )
+
+    def get_ordering(self, request):
+        """
+        Порядок, который обслуживается индексом.
+
+        Комментарии одной новости идут по индексу (news, created, id),
+        общий список — по первичному ключу.
+        """
+        if NEWS_FILTER in request.GET:
+            return ('-created', '-id')
+        return ('-id',)
+
+    def get_readonly_fields(self, request, obj=None):
+        """Перенос комментария в другую новость сломал бы счётчики."""
+        if obj is not None:
+            return ('news',)
+        return ()
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Стандартное удаление загружает все выбранные объекты разом.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(
+        description='Удалить выбранные комментарии',
+        permissions=('delete',),
+    )
+    def delete_in_chunks(self, request, queryset):
+        """
+        Удаляет комментарии пачками по DELETE_CHUNK_SIZE.
+
+        Счётчики новостей уменьшаются одним запросом на новость в пачке,
+        а не на каждый удалённый комментарий.
+        """
+        pks = queryset.order_by('pk').values_list('pk', flat=True)
+        deleted = 0
+        while True:
+            chunk = list(pks[:DELETE_CHUNK_SIZE])
+            if not chunk:
+                break
+            deleted += delete_comments(chunk)
+        self.message_user(request, f'Удалено комментариев: {deleted}.')
+
+
+def delete_news_comments(news_pks):
+    """
+    Удаляет комментарии новостей пачками перед удалением самих новостей.
+
+    Иначе каскадное удаление загрузит все комментарии разом и вызовет
+    сигналы для каждого.
+    """
+    pks = Comment.objects.filter(news__in=news_pks).order_by(
+        'pk'
+    ).values_list('pk', flat=True)
+    while True:
+        chunk = list(pks[:DELETE_CHUNK_SIZE])
+        if not chunk:
+            return
+        delete_comments(chunk)
+
+
+def delete_comments(pks):
+    """Удаляет комментарии и поправляет счётчики их новостей."""
+    comments = Comment.objects.filter(pk__in=pks)
+    with transaction.atomic(), bulk_comment_changes():
+        counts = list(
+            comments.order_by().values('news_id').annotate(count=Count('pk'))
+        )
+        comments.delete()
+        for row in counts:
+            News.objects.filter(pk=row['news_id']).update(
+                comment_count=F('comment_count') - row['count'],
+                updated=timezone.now(),
+            )
+    for row in counts:
+        purge_news_pages(row['news_id'])
+    return len(pks)
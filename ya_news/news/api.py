@@ -0,0 +1,149 @@
+"""
+JSON API только для чтения.
+
+Ответы собираются из строк values(): без экземпляров моделей и шаблонов
+выбираются только нужные клиенту столбцы. Набор полей задаётся
+параметром ?fields=id,title. Если установлен orjson, он используется
+для сериализации, иначе — стандартный json.
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.db.models import F
+from django.http import Http404, HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .conditional import news_etag, news_last_modified, news_validators
+from .models import Comment, News
+from .pagination import KeysetPaginator, _isoformat
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NEWS_FIELDS = ('id', 'title', 'text', 'date', 'updated', 'comment_count')
+# В списке по умолчанию нет текста новости: он самый тяжёлый.
+NEWS_LIST_FIELDS = ('id', 'title', 'date', 'comment_count')
+COMMENT_FIELDS = ('id', 'text', 'created', 'author_name')
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(
+        data, default=_isoformat, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+class JsonRowsResponse(HttpResponse):
+    """Ответ с данными, сериализованными функцией dumps."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(dumps(data), **kwargs)
+
+
+def select_fields(request, allowed, default):
+    """
+    Поля из параметра ?fields= в порядке запроса.
+
+    Без параметра возвращается набор по умолчанию, неизвестное поле
+    превращается в ответ 400.
+    """
+    raw = request.GET.get('fields')
+    if raw is None:
+        return default
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = set(fields) - set(allowed)
+    if not fields or unknown:
+        raise BadRequest(
+            'Доступные поля: {}.'.format(', '.join(allowed))
+        )
+    return fields
+
+
+def keyset_rows(paginator, cursor, fields):
+    """
+    Страница строк values() и курсоры на соседние страницы.
+
+    Поля порядка нужны пагинатору, даже если клиент их не запросил:
+    они выбираются, но в ответ не попадают.
+    """
+    page = paginator.get_page(cursor)
+    rows = page.object_list
+    if set(paginator.fields) - set(fields):
+        rows = [{name: row[name] for name in fields} for row in rows]
+    return {
+        'results': rows,
+        'next': page.next_cursor,
+        'previous': page.prev_cursor,
+    }
+
+
+def comment_rows(news_pk, cursor=None):
+    queryset = Comment.objects.filter(news_id=news_pk).values(
+        'id', 'text', 'created', author_name=F('author__username')
+    )
+    paginator = KeysetPaginator(
+        queryset, Comment._meta.ordering, settings.COMMENTS_COUNT_ON_PAGE
+    )
+    return keyset_rows(paginator, cursor, COMMENT_FIELDS)
+
+
+class NewsListApi(generic.View):
+    """Лента новостей без текста, постранично по ключу."""
+
+    def get(self, request):
+        fields = select_fields(request, NEWS_FIELDS, NEWS_LIST_FIELDS)
+        ordering = News._meta.ordering
+        columns = dict.fromkeys(
+            (*fields, *(name.lstrip('-') for name in ordering))
+        )
+        paginator = KeysetPaginator(
+            News.objects.values(*columns),
+            ordering,
+            settings.NEWS_COUNT_ON_API_PAGE,
+        )
+        return JsonRowsResponse(
+            keyset_rows(paginator, request.GET.get('cursor'), fields)
+        )
+
+
+class NewsDetailApi(generic.View):
+    """
+    Новость с первой страницей комментариев.
+
+    Комментарии выбираются, только если в fields есть comments.
+    Следующие страницы — через ?cursor= от предыдущего ответа.
+    """
+
+    @method_decorator(condition(
+        etag_func=news_etag,
+        last_modified_func=news_last_modified,
+    ))
+    def get(self, request, pk):
+        fields = select_fields(
+            request,
+            (*NEWS_FIELDS, 'comments'),
+            (*NEWS_FIELDS, 'comments'),
+        )
+        # Валидаторы уже выбраны для ETag, повторного запроса нет.
+        if news_validators(request, pk) is None:
+            raise Http404
+        news_fields = [name for name in fields if name != 'comments']
+        data = {}
+        if news_fields:
+            data = News.objects.filter(pk=pk).values(*news_fields).first()
+            # Новость могли удалить после выборки валидаторов, а реплика
+            # могла ещё не получить только что созданную.
+            if data is None:
+                raise Http404
+        if 'comments' in fields:
+            data['comments'] = comment_rows(pk, request.GET.get('cursor'))
+        return JsonRowsResponse(data)
@@ -1,7 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from yanews import auth, sqlite  # noqa: F401
+
+        from . import signals  # noqa: F401
+        from .search import install_search_triggers
+        post_migrate.connect(install_search_triggers, sender=self)
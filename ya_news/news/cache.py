@@ -0,0 +1,153 @@
+from time import monotonic, sleep, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.urls import reverse
+
+from yanews.routers import use_primary
+
+PAGE_KEY = 'news:page:{}'
+LOCK_KEY = 'news:page-lock:{}'
+# Новости главной страницы: шапка у каждого пользователя своя, поэтому
+# для вошедших кешируется не страница, а её выборка.
+HOME_NEWS_KEY = 'news:home-news'
+LOCK_POLL_INTERVAL = 0.05
+
+
+def page_cache_key(path):
+    return PAGE_KEY.format(path)
+
+
+def purge_pages(*paths):
+    """
+    Сбрасывает кеш страниц с указанными путями.
+
+    Кеш сбрасывается сразу и ещё раз после фиксации транзакции, чтобы
+    параллельный запрос не успел закешировать незафиксированное состояние.
+    """
+    keys = [page_cache_key(path) for path in paths]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def purge_home_page():
+    """Сбрасывает кеш главной страницы и её выборки новостей."""
+    purge_pages(reverse('news:home'))
+    cache.delete(HOME_NEWS_KEY)
+    transaction.on_commit(lambda: cache.delete(HOME_NEWS_KEY))
+
+
+def purge_news_pages(news_pk):
+    """Сбрасывает кеш главной страницы и страницы одной новости."""
+    purge_home_page()
+    purge_pages(reverse('news:detail', args=[news_pk]))
+
+
+def cached_home_news(load):
+    """
+    Новости главной страницы из кеша или из load().
+
+    В кеш кладётся вычисленный QuerySet: вместе с ним сохраняются
+    строки, и len(), count() и обход работают без запросов. Кеш общий,
+    поэтому выборка читается из основной базы, а не из реплики.
+    """
+    news = cache.get(HOME_NEWS_KEY)
+    if news is None:
+        with use_primary():
+            news = load()
+            len(news)
+        cache.set(HOME_NEWS_KEY, news, settings.PAGE_CACHE_TIMEOUT)
+    return news
+
+
+def _to_response(entry, state):
+    response = HttpResponse(
+        entry['content'],
+        content_type=entry['content_type'],
+    )
+    response['X-Page-Cache'] = state
+    return response
+
+
+def _wait_for_page(key, lock_key):
+    """
+    Ждёт, пока другой воркер отрисует страницу.
+
+    Если блокировку сняли, а страницы в кеше нет (ответ не 200 или
+    ошибка), ждать больше нечего: None, и страница рисуется сама.
+    """
+    deadline = monotonic() + settings.PAGE_CACHE_LOCK_TIMEOUT
+    while monotonic() < deadline:
+        sleep(LOCK_POLL_INTERVAL)
+        found = cache.get_many([key, lock_key])
+        if key in found:
+            return found[key]
+        if lock_key not in found:
+            return None
+    return None
+
+
+def cached_page(path, render):
+    """
+    Отдаёт страницу из кеша или отрисовывает её через render().
+
+    Перерисовывает страницу только воркер, захвативший блокировку.
+    Остальные тем временем отдают устаревшую копию, а если её нет —
+    ждут, пока страница появится в кеше. Закешированную страницу видят
+    все, поэтому она рисуется из основной базы: отставшая реплика
+    не должна попасть в кеш на PAGE_CACHE_TIMEOUT.
+    """
+    key = page_cache_key(path)
+    entry = cache.get(key)
+    if entry is not None and entry['fresh_until'] > time():
+        return _to_response(entry, 'hit')
+    lock_key = LOCK_KEY.format(path)
+    locked = cache.add(lock_key, True, settings.PAGE_CACHE_LOCK_TIMEOUT)
+    if not locked:
+        if entry is not None:
+            return _to_response(entry, 'stale')
+        entry = _wait_for_page(key, lock_key)
+        if entry is not None:
+            return _to_response(entry, 'hit')
+    try:
+        with use_primary():
+            response = render()
+            if hasattr(response, 'render'):
+                response.render()
+        if response.status_code == 200:
+            cache.set(
+                key,
+                {
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                    'fresh_until': time() + settings.PAGE_CACHE_TIMEOUT,
+                },
+                settings.PAGE_CACHE_TIMEOUT + settings.PAGE_CACHE_GRACE,
+            )
+        response['X-Page-Cache'] = 'miss'
+        return response
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кеширует страницу целиком для анонимных пользователей.
+
+    Кешируются только GET-запросы без параметров, чтобы сброс кеша
+    по сигналам затрагивал ровно один ключ на страницу.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method != 'GET' or request.GET
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        return cached_page(
+            request.path,
+            lambda: super(AnonymousPageCacheMixin, self).dispatch(
+                request, *args, **kwargs
+            ),
+        )
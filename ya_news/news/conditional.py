@@ -0,0 +1,55 @@
+from hashlib import sha256
+
+from django.middleware.csrf import get_token
+
+from yanews.routers import PRIMARY
+
+from .models import News
+
+
+def news_validators(request, pk):
+    """
+    Одним запросом по первичному ключу получает валидаторы новости.
+
+    Результат запоминается в запросе: его используют и ETag,
+    и Last-Modified. Валидаторы читаются из основной базы: по ответу
+    304 клиент оставит свою копию, и ETag от отставшей реплики
+    не должен совпасть с уже устаревшей страницей.
+    """
+    if not hasattr(request, '_news_validators'):
+        request._news_validators = (
+            News.objects.using(PRIMARY).filter(pk=pk)
+            .values('updated', 'comment_count').first()
+        )
+    return request._news_validators
+
+
+def news_etag(request, pk, **kwargs):
+    """
+    ETag страницы новости.
+
+    Страница различается для разных пользователей, поэтому в ETag входит
+    идентификатор пользователя. Вошедшему пользователю страница отдаёт
+    CSRF-токен формы комментария, поэтому в ETag входит и хеш его
+    CSRF-cookie: после повторного входа cookie другая, и 304 не оставит
+    в браузере страницу с недействительным токеном.
+    """
+    validators = news_validators(request, pk)
+    if validators is None:
+        return None
+    updated = validators['updated'].timestamp()
+    user = '0'
+    if request.user.is_authenticated:
+        # get_token заводит cookie, если её ещё нет, и ответ её выставит.
+        get_token(request)
+        secret = sha256(request.META['CSRF_COOKIE'].encode()).hexdigest()
+        user = f'{request.user.pk}-{secret[:16]}'
+    return f'{pk}-{updated:.6f}-{validators["comment_count"]}-{user}'
+
+
+def news_last_modified(request, pk, **kwargs):
+    """Last-Modified отдаём только анонимам: для них страница общая."""
+    if request.user.is_authenticated:
+        return None
+    validators = news_validators(request, pk)
+    return validators['updated'] if validators else None
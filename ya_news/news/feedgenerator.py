@@ -0,0 +1,58 @@
+from io import StringIO
+
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+
+
+class StreamingFeedMixin:
+    """
+    Потоковая запись ленты: документ отдаётся по одному элементу.
+
+    В отличие от write() не требует заранее собрать все элементы
+    в self.items.
+    """
+
+    def stream(self, items, encoding='utf-8'):
+        """Генератор кусков XML; items — аргументы для add_item()."""
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, encoding)
+        handler.startDocument()
+        self.start_root(handler)
+        yield self._drain(buffer)
+        for item in items:
+            self.items = []
+            self.add_item(**item)
+            self.write_items(handler)
+            yield self._drain(buffer)
+        self.items = []
+        self.end_root(handler)
+        yield self._drain(buffer)
+
+    @staticmethod
+    def _drain(buffer):
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+
+    def start_root(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_root(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+
+    def start_root(self, handler):
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_root(self, handler):
+        handler.endElement('feed')
@@ -0,0 +1,169 @@
+import json
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
+from django.views import generic
+
+from .feedgenerator import StreamingAtomFeed, StreamingRssFeed
+from .models import Comment, News, NewsTombstone
+from .pagination import FORWARD, KeysetPaginator
+
+NEWS_FIELDS = ('id', 'title', 'text', 'date', 'updated', 'comment_count')
+# Порядок выгрузки: изменённые позже новости идут последними, поэтому
+# курсор последней выданной новости отмечает, что клиент уже получил.
+FEED_ORDERING = ('updated', 'id')
+
+
+def feed_paginator():
+    return KeysetPaginator(
+        News.objects.values(*NEWS_FIELDS),
+        FEED_ORDERING,
+        settings.FEED_BATCH_SIZE,
+    )
+
+
+def tombstone_paginator():
+    """Удалённые новости в том же порядке и с тем же курсором."""
+    return KeysetPaginator(
+        NewsTombstone.objects.values(*FEED_ORDERING),
+        FEED_ORDERING,
+        settings.FEED_BATCH_SIZE,
+    )
+
+
+def get_since(request, paginator):
+    """
+    Курсор из параметра since.
+
+    Проверяется до начала выгрузки, чтобы ошибка стала ответом 400,
+    а не оборвала уже начатый поток.
+    """
+    since = request.GET.get('since')
+    if since:
+        paginator.decode_cursor(since)
+    return since
+
+
+def news_batches(paginator, since=None, deleted=None):
+    """
+    Перебирает пачки новостей, изменённых после курсора since.
+
+    Если передан deleted — пагинатор отметок об удалении, — в пачки
+    в общем порядке (updated, id) попадают и удалённые новости, с ключом
+    deleted. Вместе с каждой пачкой отдаётся курсор, с которого клиент
+    может продолжить выгрузку.
+    """
+    cursor = since
+    while True:
+        pages = [paginator.get_page(cursor)]
+        if deleted is not None:
+            pages.append(deleted.get_page(cursor))
+            for row in pages[-1]:
+                row['deleted'] = True
+        rows = sorted(
+            (row for page in pages for row in page),
+            key=lambda row: (row['updated'], row['id']),
+        )
+        batch = rows[:paginator.per_page]
+        if not batch:
+            return
+        cursor = paginator.encode_cursor(batch[-1], FORWARD)
+        yield batch, cursor
+        if len(rows) <= len(batch) and not any(
+            page.next_cursor for page in pages
+        ):
+            return
+
+
+def batch_comments(news_rows):
+    """Комментарии пачки новостей одним потоковым запросом."""
+    return Comment.objects.filter(
+        news_id__in=[row['id'] for row in news_rows if 'deleted' not in row]
+    ).order_by('news_id', 'created', 'id').values(
+        'id', 'news_id', 'text', 'created', author_name=F('author__username')
+    ).iterator(chunk_size=settings.FEED_BATCH_SIZE)
+
+
+def ndjson_line(record):
+    return json.dumps(
+        record, cls=DjangoJSONEncoder, ensure_ascii=False
+    ) + '\n'
+
+
+def ndjson_stream(paginator, since):
+    batches = news_batches(paginator, since, tombstone_paginator())
+    for news_rows, cursor in batches:
+        for row in news_rows:
+            if 'deleted' in row:
+                yield ndjson_line({'type': 'deleted', 'id': row['id']})
+            else:
+                yield ndjson_line({'type': 'news', **row})
+        for comment in batch_comments(news_rows):
+            yield ndjson_line({'type': 'comment', **comment})
+        yield ndjson_line({'type': 'cursor', 'since': cursor})
+
+
+class NewsNdjsonFeed(generic.View):
+    """
+    Выгрузка новостей и комментариев в NDJSON.
+
+    После каждой пачки идёт строка с курсором: передав его в параметре
+    since, клиент получит только новости, изменённые после этой пачки,
+    вместе со всеми их комментариями, и строки deleted с номерами
+    удалённых новостей.
+    """
+
+    def get(self, request):
+        paginator = feed_paginator()
+        since = get_since(request, paginator)
+        return StreamingHttpResponse(
+            ndjson_stream(paginator, since),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+
+
+class NewsFeed(generic.View):
+    """Лента RSS или Atom, отдаётся по мере чтения новостей."""
+    feed_class = StreamingRssFeed
+
+    def get(self, request):
+        feed = self.feed_class(
+            title='YaNews',
+            link=request.build_absolute_uri(reverse('news:home')),
+            description='Новости YaNews',
+            language=settings.LANGUAGE_CODE,
+            feed_url=request.build_absolute_uri(),
+        )
+        paginator = feed_paginator()
+        batches = news_batches(paginator, get_since(request, paginator))
+        return StreamingHttpResponse(
+            feed.stream(self.items(request, batches)),
+            content_type=feed.content_type,
+        )
+
+    def items(self, request, batches):
+        for news_rows, _ in batches:
+            for row in news_rows:
+                link = request.build_absolute_uri(
+                    reverse('news:detail', args=[row['id']])
+                )
+                yield {
+                    'title': row['title'],
+                    'link': link,
+                    'description': Truncator(row['text']).words(15),
+                    'unique_id': link,
+                    'pubdate': timezone.make_aware(
+                        datetime.combine(row['date'], time.min)
+                    ),
+                    'updateddate': row['updated'],
+                }
+
+
+class NewsAtomFeed(NewsFeed):
+    feed_class = StreamingAtomFeed
@@ -0,0 +1,74 @@
+"""
+Текстовое поле, которое хранит длинные значения сжатыми.
+
+В базе лежат байты: первый байт — формат, за ним содержимое. Короткие
+тексты сжатие почти не уменьшает, их сохраняют как есть. Для форм,
+шаблонов и админки поле ничем не отличается от TextField.
+"""
+import zlib
+
+from django.db import models
+
+RAW = b'\x00'
+ZLIB = b'\x01'
+# Тексты короче этого числа байт не сжимаются.
+COMPRESS_MIN_SIZE = 512
+COMPRESS_LEVEL = 6
+
+
+def compress(text, min_size=COMPRESS_MIN_SIZE, level=COMPRESS_LEVEL):
+    data = text.encode('utf-8')
+    if len(data) >= min_size:
+        packed = zlib.compress(data, level)
+        if len(packed) < len(data):
+            return ZLIB + packed
+    return RAW + data
+
+
+def decompress(value):
+    """Строки — значения, записанные ещё до сжатия; их отдают как есть."""
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    header, data = value[:1], value[1:]
+    if header == ZLIB:
+        data = zlib.decompress(data)
+    elif header != RAW:
+        raise ValueError(f'Неизвестный формат сжатого текста: {header!r}.')
+    return data.decode('utf-8')
+
+
+class CompressedTextField(models.TextField):
+    """
+    TextField, сжимающий значения от min_size байт через zlib.
+
+    По содержимому такого поля нельзя искать средствами базы.
+    """
+
+    def __init__(self, *args, min_size=COMPRESS_MIN_SIZE,
+                 level=COMPRESS_LEVEL, **kwargs):
+        self.min_size = min_size
+        self.level = level
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.min_size != COMPRESS_MIN_SIZE:
+            kwargs['min_size'] = self.min_size
+        if self.level != COMPRESS_LEVEL:
+            kwargs['level'] = self.level
+        return name, path, args, kwargs
+
+    def db_type(self, connection):
+        return models.BinaryField().db_type(connection)
+
+    def from_db_value(self, value, expression, connection):
+        return decompress(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        return connection.Database.Binary(
+            compress(value, self.min_size, self.level)
+        )
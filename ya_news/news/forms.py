@@ -2,15 +2,23 @@ from django.core.exceptions import ValidationError
 from django.forms import ModelForm
 
 from .models import Comment
+from .moderation import get_bad_words_matcher
 
-BAD_WORDS = (
-    'редиска',
-    'негодяй',
-    # Дополните список на своё усмотрение.
-)
 WARNING = 'Не ругайтесь!'
 
 
+def __getattr__(name):
+    """
+    BAD_WORDS читается при обращении, а не при импорте модуля.
+
+    Так импорт форм не загружает словарь, а слова всегда берутся
+    из текущих настроек.
+    """
+    if name == 'BAD_WORDS':
+        return get_bad_words_matcher().words
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 class CommentForm(ModelForm):
 
     class Meta:
@@ -20,8 +28,6 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if get_bad_words_matcher().search(text):
+            raise ValidationError(WARNING)
         return text
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from news.cache import purge_home_page, purge_pages
+from news.models import Comment, News
+
+# Модель, производное поле и поле с новостью, страница которой меняется.
+DERIVED_FIELDS = (
+    (News, 'excerpt', 'pk'),
+    (Comment, 'text_html', 'news_id'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает анонсы новостей и HTML комментариев, например '
+        'после миграции или смены правил их построения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько строк читать и обновлять за раз.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        for model, field, news_field in DERIVED_FIELDS:
+            updated = backfill(
+                model, field, news_field, options['batch_size']
+            )
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}.'
+            )
+
+
+def touch_news(news_ids):
+    """
+    Отмечает новости изменёнными и сбрасывает кеш их страниц.
+
+    bulk_update не трогает поле updated и не шлёт сигналов, а новый
+    анонс или HTML комментария меняют страницу: без этого ETag и кеш
+    страниц отдавали бы старую версию.
+    """
+    if not news_ids:
+        return
+    News.objects.filter(pk__in=news_ids).update(updated=timezone.now())
+    purge_home_page()
+    purge_pages(*(reverse('news:detail', args=[pk]) for pk in news_ids))
+
+
+def backfill(model, field, news_field, batch_size):
+    """
+    Обходит таблицу пачками по первичному ключу и записывает только
+    изменившиеся значения.
+    """
+    queryset = model.objects.only(
+        'pk', 'text', field, news_field
+    ).order_by('pk')
+    last_pk = 0
+    updated = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return updated
+        last_pk = batch[-1].pk
+        changed = []
+        for obj in batch:
+            old = getattr(obj, field)
+            obj.fill_derived_fields()
+            if getattr(obj, field) != old:
+                changed.append(obj)
+        model.objects.bulk_update(changed, [field])
+        touch_news({getattr(obj, news_field) for obj in changed})
+        updated += len(changed)
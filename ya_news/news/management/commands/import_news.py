@@ -0,0 +1,159 @@
+import csv
+import json
+import os
+import sys
+from itertools import dropwhile, islice
+from pathlib import Path
+from time import monotonic
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from news.cache import purge_home_page
+from news.models import News
+
+FIELDS = ('title', 'text', 'date')
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает новости из JSONL или CSV (файл или stdin) '
+        'пачками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help='Путь к файлу или «-» для чтения из stdin.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=('jsonl', 'csv'),
+            help='Формат данных; по умолчанию — по расширению файла.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько строк вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help=(
+                'Файл с номером последней загруженной строки. Если он '
+                'существует, загрузка продолжится с этого места.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        source = options['source']
+        data_format = options['format'] or (
+            'csv' if source.endswith('.csv') else 'jsonl'
+        )
+        checkpoint = options['checkpoint'] and Path(options['checkpoint'])
+        done = self.read_checkpoint(checkpoint)
+        if source == '-':
+            return self.load(sys.stdin, data_format, done, checkpoint,
+                             options['batch_size'])
+        try:
+            file = open(source, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {source}: {error}')
+        with file:
+            self.load(file, data_format, done, checkpoint,
+                      options['batch_size'])
+
+    def read_checkpoint(self, checkpoint):
+        if not checkpoint or not checkpoint.exists():
+            return 0
+        done = json.loads(checkpoint.read_text())['rows']
+        self.stdout.write(f'Продолжаем после строки {done}.')
+        return done
+
+    def load(self, file, data_format, done, checkpoint, batch_size):
+        rows = dropwhile(
+            lambda item: item[0] <= done, read_rows(file, data_format)
+        )
+        started = monotonic()
+        created = errors = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            objects = []
+            for number, row in batch:
+                try:
+                    objects.append(build_news(row))
+                except ValidationError as error:
+                    errors += 1
+                    self.stderr.write(
+                        f'Строка {number}: {"; ".join(error.messages)}'
+                    )
+            with transaction.atomic():
+                News.objects.bulk_create(objects)
+            done = batch[-1][0]
+            created += len(objects)
+            if checkpoint:
+                write_checkpoint(checkpoint, done)
+            elapsed = monotonic() - started
+            self.stdout.write(
+                f'Строк: {done}, загружено: {created}, ошибок: {errors}, '
+                f'{created / elapsed if elapsed else 0:.0f} новостей/с'
+            )
+        purge_home_page()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: загружено {created} новостей, ошибок {errors}.'
+        ))
+
+
+def write_checkpoint(checkpoint, done):
+    """
+    Записывает номер строки через временный файл.
+
+    os.replace атомарен, поэтому обрыв посреди записи не оставит
+    вместо отметки пустой или обрезанный файл.
+    """
+    temporary = checkpoint.with_name(f'{checkpoint.name}.tmp')
+    temporary.write_text(json.dumps({'rows': done}))
+    os.replace(temporary, checkpoint)
+
+
+def read_rows(file, data_format):
+    """Лениво перечисляет пары (номер строки, словарь полей)."""
+    if data_format == 'csv':
+        return enumerate(csv.DictReader(file), start=1)
+    return (
+        (number, parse_json_line(line))
+        for number, line in enumerate(file, start=1)
+        if line.strip()
+    )
+
+
+def parse_json_line(line):
+    try:
+        row = json.loads(line)
+    except ValueError as error:
+        return ValidationError(f'Некорректный JSON: {error}')
+    return row if isinstance(row, dict) else ValidationError(
+        'Ожидался JSON-объект.'
+    )
+
+
+def build_news(row):
+    """Проверяет строку и создаёт из неё несохранённую новость."""
+    if isinstance(row, ValidationError):
+        raise row
+    news = News(**{
+        field: row[field] for field in FIELDS if row.get(field)
+    })
+    try:
+        news.full_clean(exclude=('comment_count',))
+    except TypeError as error:
+        # parse_date и подобные падают с TypeError на нестроковых значениях.
+        raise ValidationError(f'Некорректный тип значения: {error}')
+    # bulk_create не вызывает save(), анонс считается здесь.
+    news.fill_derived_fields()
+    return news
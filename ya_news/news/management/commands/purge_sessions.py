@@ -0,0 +1,29 @@
+from importlib import import_module
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии из базы. С --interval работает '
+        'как планировщик и повторяет очистку каждые N секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять очистку каждые N секунд.',
+        )
+
+    def handle(self, *args, **options):
+        engine = import_module(settings.SESSION_ENGINE)
+        while True:
+            engine.SessionStore.clear_expired()
+            self.stdout.write('Истёкшие сессии удалены.')
+            if not options['interval']:
+                return
+            sleep(options['interval'])
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from news.search import (install_search_triggers, optimize_search_index,
+                         rebuild_search_index)
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс новостей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--optimize',
+            action='store_true',
+            help='После перестройки слить сегменты индекса в один.',
+        )
+
+    def handle(self, *args, **options):
+        install_search_triggers()
+        rebuild_search_index()
+        if options['optimize']:
+            optimize_search_index()
+        self.stdout.write(self.style.SUCCESS('Индекс новостей перестроен.'))
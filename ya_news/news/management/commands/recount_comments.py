@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from news.models import Comment, News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает или проверяет счётчики комментариев новостей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, ничего не изменяя.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            broken = News.objects.annotate(
+                actual=Count('comment')
+            ).filter(~Q(comment_count=F('actual'))).count()
+            if broken:
+                raise CommandError(
+                    f'Неверный счётчик комментариев у {broken} новостей.'
+                )
+            self.stdout.write('Счётчики комментариев в порядке.')
+            return
+        updated = News.objects.update(comment_count=count_subquery())
+        self.stdout.write(f'Пересчитаны счётчики у {updated} новостей.')
+
+
+def count_subquery():
+    """Подзапрос с фактическим числом комментариев новости."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(news=OuterRef('pk'))
+            .order_by()
+            .values('news')
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0,
+    )
@@ -0,0 +1,146 @@
+import random
+from datetime import timedelta
+from itertools import islice
+from secrets import token_hex
+from time import monotonic
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from news.cache import purge_home_page
+from news.models import Comment, News
+
+# Пароль всех сгенерированных пользователей.
+SEED_PASSWORD = 'seed-password'
+WORDS = (
+    'новость', 'город', 'погода', 'выставка', 'концерт', 'дорога',
+    'школа', 'парк', 'мост', 'транспорт', 'рынок', 'театр', 'спорт',
+    'жители', 'проект', 'ремонт', 'праздник', 'музей', 'река', 'лес',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей, новости и комментарии пачками '
+        'через bulk_create, например для нагрузочных бенчмарков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument(
+            '--comments',
+            type=int,
+            default=10000,
+            help='Всего комментариев; делятся между новостями неравномерно.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора: одинаковые запуски дают одни данные.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        if options['users'] < 1 and options['comments']:
+            raise CommandError('Комментариям нужен хотя бы один автор.')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # Метка запуска не зависит от зерна: повторный запуск с тем же
+        # зерном не столкнётся с уже созданными именами.
+        self.tag = token_hex(4)
+        user_ids = self.create_users(options['users'])
+        news = self.create_news(options['news'], options['comments'])
+        self.create_comments(news, user_ids)
+        purge_home_page()
+
+    def bulk_create(self, model, objects, total, label):
+        """Вставляет объекты пачками, каждую — в своей транзакции."""
+        started = monotonic()
+        done = 0
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            done += len(batch)
+            elapsed = monotonic() - started
+            self.stdout.write(
+                f'{label}: {done} из {total}, '
+                f'{done / elapsed if elapsed else 0:.0f} в секунду'
+            )
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize()
+
+    def create_users(self, count):
+        user_model = get_user_model()
+        password = make_password(SEED_PASSWORD)
+        first = user_model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        self.bulk_create(user_model, (
+            user_model(username=f'seed-{self.tag}-{index}', password=password)
+            for index in range(count)
+        ), count, 'пользователи')
+        return list(user_model.objects.filter(pk__gt=first).values_list(
+            'pk', flat=True
+        ))
+
+    def comment_counts(self, news, comments):
+        """
+        Делит комментарии между новостями по распределению Парето:
+        у немногих новостей длинные обсуждения, у большинства — короткие.
+        """
+        weights = [self.rng.paretovariate(1.2) for _ in range(news)]
+        total = sum(weights)
+        counts = [int(comments * weight / total) for weight in weights]
+        if counts:
+            counts[0] += comments - sum(counts)
+        return counts
+
+    def create_news(self, count, comments):
+        today = timezone.localdate()
+        counts = self.comment_counts(count, comments)
+        first = News.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+
+        def generate():
+            for index, comment_count in enumerate(counts):
+                news = News(
+                    title=self.text(4)[:50],
+                    text=self.text(self.rng.randint(30, 300)),
+                    date=today - timedelta(days=index // 10),
+                    comment_count=comment_count,
+                )
+                news.fill_derived_fields()
+                yield news
+
+        self.bulk_create(News, generate(), count, 'новости')
+        return list(News.objects.filter(pk__gt=first).values_list(
+            'pk', 'comment_count'
+        ).order_by('pk'))
+
+    def create_comments(self, news, user_ids):
+        total = sum(comment_count for _, comment_count in news)
+
+        def generate():
+            for news_id, comment_count in news:
+                for _ in range(comment_count):
+                    comment = Comment(
+                        news_id=news_id,
+                        author_id=self.rng.choice(user_ids),
+                        text=self.text(self.rng.randint(3, 40)),
+                    )
+                    comment.fill_derived_fields()
+                    yield comment
+
+        self.bulk_create(Comment, generate(), total, 'комментарии')
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_news_updated'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['updated', 'id'], name='news_updated_id_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Триггеры, поддерживающие индекс, ставит обработчик post_migrate
+# news.search.install_search_triggers: Django пересоздаёт таблицу
+# news_news при изменении модели, и созданные здесь триггеры бы пропали.
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS news_search USING fts5('
+        "title, text, content='news_news', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        "INSERT INTO news_search(news_search) VALUES ('rebuild')"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for action in ('insert', 'delete', 'update'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS news_search_{action}')
+    schema_editor.execute('DROP TABLE IF EXISTS news_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_news_updated_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
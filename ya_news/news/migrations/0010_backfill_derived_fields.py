@@ -0,0 +1,53 @@
+from django.db import migrations
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+# Копии news.models.make_excerpt и make_text_html на момент миграции:
+# миграция не должна меняться вместе с кодом моделей.
+def make_excerpt(text):
+    return Truncator(text).words(15, truncate=' …')
+
+
+def make_text_html(text):
+    return linebreaksbr(text, autoescape=True)
+
+
+def backfill(model, alias, field, make):
+    """Заполняет пустое производное поле пачками по первичному ключу."""
+    objects = model.objects.using(alias)
+    queryset = objects.filter(**{field: ''}).only('pk', 'text')
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[
+            :BATCH_SIZE
+        ])
+        if not batch:
+            return
+        for obj in batch:
+            setattr(obj, field, make(obj.text))
+        objects.bulk_update(batch, [field])
+        last_pk = batch[-1].pk
+
+
+def backfill_derived_fields(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    backfill(apps.get_model('news', 'News'), alias, 'excerpt', make_excerpt)
+    backfill(
+        apps.get_model('news', 'Comment'), alias, 'text_html', make_text_html
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_compress_comment_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_derived_fields, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:38
+
+from django.db import migrations, models
+import news.fields
+
+BATCH_SIZE = 500
+
+
+def rewrite_html(apps, alias, field):
+    """Перезаписывает HTML комментариев пачками по первичному ключу."""
+    objects = apps.get_model('news', 'Comment').objects.using(alias)
+    last_pk = 0
+    while True:
+        batch = list(
+            objects.filter(pk__gt=last_pk).only('pk', 'text_html')
+            .order_by('pk')[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        if field is not None:
+            for comment in batch:
+                comment.text_html = models.Value(
+                    comment.text_html, output_field=field
+                )
+        objects.bulk_update(batch, ['text_html'])
+        last_pk = batch[-1].pk
+
+
+def compress_html(apps, schema_editor):
+    rewrite_html(apps, schema_editor.connection.alias, None)
+
+
+def decompress_html(apps, schema_editor):
+    # Пишем обычные строки в обход сжатия: потом столбец снова станет TEXT.
+    rewrite_html(apps, schema_editor.connection.alias, models.TextField())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0010_backfill_derived_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='text_html',
+            field=news.fields.CompressedTextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(compress_html, decompress_html),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0011_compress_comment_text_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsTombstone',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('updated', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='newstombstone',
+            index=models.Index(fields=['updated', 'id'], name='tombstone_updated_id_idx'),
+        ),
+    ]
@@ -2,21 +2,62 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+from .fields import CompressedTextField
+
+EXCERPT_WORDS = 15
+
+
+def make_excerpt(text):
+    """Анонс для ленты: то же, что давал фильтр truncatewords."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+def make_text_html(text):
+    """Экранированный HTML текста с переносами строк."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def with_derived(update_fields, source, derived):
+    """Добавляет производное поле к update_fields, если меняется исходное."""
+    if update_fields is not None and source in update_fields:
+        return {*update_fields, derived}
+    return update_fields
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
+    # Не сжимается: индекс FTS5 читает текст прямо из news_news.
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    updated = models.DateTimeField(auto_now=True)
+    excerpt = models.TextField(editable=False, blank=True)
 
     class Meta:
-        ordering = ('-date',)
+        ordering = ('-date', '-id')
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+            models.Index(fields=('updated', 'id'), name='news_updated_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.fill_derived_fields()
+        kwargs['update_fields'] = with_derived(
+            kwargs.get('update_fields'), 'text', 'excerpt'
+        )
+        super().save(*args, **kwargs)
+
+    def fill_derived_fields(self):
+        self.excerpt = make_excerpt(self.text)
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -27,11 +68,47 @@ class Comment(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
-    text = models.TextField()
+    text = CompressedTextField()
+    text_html = CompressedTextField(editable=False, blank=True)
     created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ('created',)
+        ordering = ('created', 'id')
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    def save(self, *args, **kwargs):
+        self.fill_derived_fields()
+        kwargs['update_fields'] = with_derived(
+            kwargs.get('update_fields'), 'text', 'text_html'
+        )
+        super().save(*args, **kwargs)
+
+    def fill_derived_fields(self):
+        self.text_html = make_text_html(self.text)
+
+
+class NewsTombstone(models.Model):
+    """
+    Отметка об удалённой новости для выгрузки с курсором since.
+
+    id — первичный ключ удалённой новости, updated — время удаления:
+    поля совпадают с ключом выгрузки (updated, id), и курсор годится
+    для обеих таблиц. Номера новостей в SQLite не переиспользуются.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    updated = models.DateTimeField()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('updated', 'id'), name='tombstone_updated_id_idx'
+            ),
+        )
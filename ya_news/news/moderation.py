@@ -0,0 +1,118 @@
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# Латинские буквы и цифры, которыми подменяют похожие кириллические.
+HOMOGLYPHS = str.maketrans({
+    'a': 'а', 'b': 'в', 'c': 'с', 'e': 'е', 'h': 'н', 'k': 'к', 'm': 'м',
+    'o': 'о', 'p': 'р', 't': 'т', 'x': 'х', 'y': 'у', '0': 'о', '3': 'з',
+})
+YO = str.maketrans({'ё': 'е'})
+
+
+def normalize(text, homoglyphs=True):
+    """Приводит текст к виду, в котором ищутся слова из словаря."""
+    text = text.lower().translate(YO)
+    if homoglyphs:
+        text = text.translate(HOMOGLYPHS)
+    return text
+
+
+def load_words(path):
+    """Читает словарь: по слову на строку, строки с # пропускаются."""
+    with open(path, encoding='utf-8') as file:
+        return tuple(
+            line.strip() for line in file
+            if line.strip() and not line.lstrip().startswith('#')
+        )
+
+
+class WordMatcher:
+    """
+    Автомат Ахо — Корасик для поиска всех слов словаря за один проход.
+
+    Время проверки текста зависит от длины текста, а не от размера
+    словаря. Слова и текст нормализуются одинаково, длина строки при
+    нормализации не меняется, поэтому границы слов проверяются по
+    нормализованному тексту.
+    """
+
+    def __init__(self, words, whole_words=False, homoglyphs=True):
+        self.words = tuple(words)
+        self.whole_words = whole_words
+        self.homoglyphs = homoglyphs
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for word in self.words:
+            self._add(normalize(word, homoglyphs))
+        self._link()
+
+    def _add(self, word):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        if word:
+            self._output[state] += (len(word),)
+
+    def _link(self):
+        """Строит суффиксные ссылки обходом бора в ширину."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] += (
+                    self._output[self._fail[next_state]]
+                )
+
+    def _is_whole_word(self, text, start, end):
+        before = text[start - 1] if start > 0 else ' '
+        after = text[end] if end < len(text) else ' '
+        return not before.isalnum() and not after.isalnum()
+
+    def search(self, text):
+        """Возвращает первое найденное слово словаря или None."""
+        text = normalize(text, self.homoglyphs)
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length in output[state]:
+                start = end - length
+                if (not self.whole_words
+                        or self._is_whole_word(text, start, end)):
+                    return text[start:end]
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_bad_words_matcher():
+    """Автомат для словаря из настроек; собирается один раз."""
+    return WordMatcher(
+        load_words(settings.BAD_WORDS_FILE),
+        whole_words=settings.BAD_WORDS_WHOLE_WORDS,
+        homoglyphs=settings.BAD_WORDS_HOMOGLYPHS,
+    )
+
+
+@receiver(setting_changed)
+def reset_bad_words_matcher(setting, **kwargs):
+    if setting.startswith('BAD_WORDS_'):
+        get_bad_words_matcher.cache_clear()
@@ -0,0 +1,92 @@
+"""
+Фабрики тестовых данных.
+
+Графы объектов создаются через bulk_create: число запросов не зависит
+от числа объектов. Время задаётся явно, от BASE_TIME, чтобы порядок
+и курсоры в тестах не зависели от часов.
+"""
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import (
+    DateTimeField, DurationField, ExpressionWrapper, F, Max, Value
+)
+from django.utils import timezone
+
+from news.models import Comment, News
+
+BASE_TIME = datetime(2022, 1, 1, 12, tzinfo=timezone.utc)
+DAY_MICROSECONDS = 24 * 60 * 60 * 10 ** 6
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def make_users(count, prefix='Пользователь'):
+    """Пользователи без пароля: вход в тестах — через force_login."""
+    user_model = get_user_model()
+    start = next_pk(user_model)
+    users = [
+        user_model(pk=start + index, username=f'{prefix} {start + index}')
+        for index in range(count)
+    ]
+    for user in users:
+        user.set_unusable_password()
+    return user_model.objects.bulk_create(users)
+
+
+def make_news(count, start=None):
+    """Новости, каждая следующая на день старше предыдущей."""
+    start_date = (start or BASE_TIME).date()
+    first = next_pk(News)
+    news = [
+        News(
+            pk=first + index,
+            title=f'Новость {index}',
+            text='Текст новости',
+            date=start_date - timedelta(days=index),
+        )
+        for index in range(count)
+    ]
+    for item in news:
+        item.fill_derived_fields()
+    return News.objects.bulk_create(news)
+
+
+def make_comments(news, authors, count, start=None):
+    """
+    Комментарии к новости по кругу от authors, с интервалом в день.
+
+    created с auto_now_add перезаписывается при вставке, поэтому время
+    выставляется вторым запросом: start плюс столько дней, каков номер
+    комментария. Счётчик новости увеличивается так же, как это сделали
+    бы сигналы.
+    """
+    start = start or BASE_TIME
+    first = next_pk(Comment)
+    comments = [
+        Comment(
+            pk=first + index,
+            news=news,
+            author=authors[index % len(authors)],
+            text=f'Текст комментария {index}',
+        )
+        for index in range(count)
+    ]
+    for comment in comments:
+        comment.fill_derived_fields()
+    Comment.objects.bulk_create(comments)
+    Comment.objects.filter(pk__gte=first).update(created=(
+        Value(start, output_field=DateTimeField())
+        + ExpressionWrapper(
+            (F('pk') - first) * DAY_MICROSECONDS,
+            output_field=DurationField(),
+        )
+    ))
+    for index, comment in enumerate(comments):
+        comment.created = start + timedelta(days=index)
+    News.objects.filter(pk=news.pk).update(
+        comment_count=F('comment_count') + count
+    )
+    return comments
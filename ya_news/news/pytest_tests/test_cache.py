@@ -0,0 +1,160 @@
+from http import HTTPStatus
+from threading import Timer
+from time import monotonic, time
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+from news.cache import LOCK_KEY, _wait_for_page, page_cache_key
+from news.models import Comment, News
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(params=('locmem', 'filebased'))
+def page_cache(request, settings, tmp_path):
+    backends = {
+        'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+        'filebased': 'yanews.cache.FileBasedCache',
+    }
+    settings.CACHES = {
+        **settings.CACHES,
+        'default': {
+            'BACKEND': backends[request.param],
+            'LOCATION': str(tmp_path),
+        },
+    }
+    return request.param
+
+
+@pytest.mark.usefixtures('page_cache')
+def test_anonymous_pages_are_cached(client, news_pk):
+    for url in (reverse('news:home'), reverse('news:detail', args=news_pk)):
+        assert client.get(url)['X-Page-Cache'] == 'miss'
+        response = client.get(url)
+        assert response['X-Page-Cache'] == 'hit'
+        assert response.context is None
+
+
+def test_authenticated_pages_are_not_cached(author_client, news_pk):
+    url = reverse('news:detail', args=news_pk)
+    author_client.get(url)
+    assert not author_client.get(url).has_header('X-Page-Cache')
+
+
+@pytest.mark.usefixtures('page_cache')
+def test_comment_purges_only_related_pages(client, author, news):
+    other = News.objects.create(title='Другая новость', text='Текст')
+    urls = {
+        'home': reverse('news:home'),
+        'news': reverse('news:detail', args=[news.pk]),
+        'other': reverse('news:detail', args=[other.pk]),
+    }
+    for url in urls.values():
+        client.get(url)
+    Comment.objects.create(news=news, author=author, text='Комментарий')
+    assert client.get(urls['home'])['X-Page-Cache'] == 'miss'
+    assert client.get(urls['news'])['X-Page-Cache'] == 'miss'
+    assert client.get(urls['other'])['X-Page-Cache'] == 'hit'
+
+
+@pytest.mark.usefixtures('page_cache')
+def test_only_one_worker_rerenders_expired_page(client, news_pk):
+    url = reverse('news:detail', args=news_pk)
+    client.get(url)
+    key, cache = page_cache_key(url), caches['default']
+    entry = cache.get(key)
+    entry['fresh_until'] = time() - 1
+    cache.set(key, entry)
+    cache.add(LOCK_KEY.format(url), True)
+    assert client.get(url)['X-Page-Cache'] == 'stale'
+    cache.delete(LOCK_KEY.format(url))
+    assert client.get(url)['X-Page-Cache'] == 'miss'
+
+
+@pytest.mark.usefixtures('page_cache')
+def test_waiters_stop_when_lock_is_released_without_page(settings):
+    settings.PAGE_CACHE_LOCK_TIMEOUT = 10
+    key, lock_key = page_cache_key('/missing/'), LOCK_KEY.format('/missing/')
+    cache = caches['default']
+    cache.add(lock_key, True)
+    timer = Timer(0.2, cache.delete, args=[lock_key])
+    timer.start()
+    started = monotonic()
+    assert _wait_for_page(key, lock_key) is None
+    timer.join()
+    assert monotonic() - started < 2
+
+
+def test_lock_is_released_after_not_found(client):
+    url = reverse('news:detail', args=[0])
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert caches['default'].get(LOCK_KEY.format(url)) is None
+
+
+def test_detail_not_modified(client, news_pk, django_assert_num_queries):
+    url = reverse('news:detail', args=news_pk)
+    response = client.get(url)
+    with django_assert_num_queries(1):
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    by_date = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert by_date.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_detail_etag_changes_with_comments(author_client, comment, news_pk):
+    url = reverse('news:detail', args=news_pk)
+    etag = author_client.get(url)['ETag']
+    assert not author_client.get(url).has_header('Last-Modified')
+    author_client.post(reverse('news:edit', args=[comment.pk]), {
+        'text': 'Исправленный комментарий'
+    })
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_detail_etag_changes_after_login(news, django_user_model):
+    client = Client(enforce_csrf_checks=True)
+    django_user_model.objects.create_user('Читатель', password='пароль')
+    login_url = reverse('users:login')
+    url = reverse('news:detail', args=[news.pk])
+
+    def login():
+        token = client.get(login_url).context['csrf_token']
+        client.post(login_url, {
+            'username': 'Читатель',
+            'password': 'пароль',
+            'csrfmiddlewaretoken': token,
+        })
+
+    login()
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+        HTTPStatus.NOT_MODIFIED
+    )
+    client.get(reverse('users:logout'))
+    login()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    response = client.post(url, {
+        'text': 'Комментарий',
+        'csrfmiddlewaretoken': response.context['csrf_token'],
+    })
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_import_purges_home_news(author_client, tmp_path):
+    url = reverse('news:home')
+    author_client.get(url)
+    source = tmp_path / 'news.jsonl'
+    source.write_text(
+        '{"title": "Импортированная", "text": "Текст"}\n', encoding='utf-8'
+    )
+    call_command('import_news', str(source))
+    assert 'Импортированная' in author_client.get(url).content.decode()
@@ -1,8 +1,18 @@
+import json
+from http import HTTPStatus
+from xml.etree import ElementTree
+
 import pytest
 from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from news.forms import CommentForm
+from news.models import Comment, News
+from news.pagination import dump_cursor
+from news.search import search_news
 
 pytestmark = pytest.mark.django_db
 
@@ -53,3 +63,234 @@ def test_comments_order(client, news_pk):
     )
     for current, expected in zip(comments, comments_sorted_list):
         assert current.created == expected.created
+
+
+@pytest.mark.usefixtures('set_of_news')
+def test_archive_walks_all_news(client, settings):
+    settings.NEWS_COUNT_ON_ARCHIVE_PAGE = 4
+    url = reverse('news:archive')
+    expected = list(News.objects.values_list('pk', flat=True))
+    seen = []
+    response = client.get(url)
+    while True:
+        page = response.context['page']
+        seen.extend(news.pk for news in page)
+        if not page.next_cursor:
+            break
+        response = client.get(url, {'cursor': page.next_cursor})
+    assert seen == expected
+    back = client.get(url, {'cursor': page.prev_cursor}).context['page']
+    assert [news.pk for news in back] == expected[4:8]
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    ('broken', dump_cursor(['a', [None, None]]), dump_cursor(['a', [None]])),
+)
+def test_archive_rejects_broken_cursor(client, cursor):
+    response = client.get(reverse('news:archive'), {'cursor': cursor})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.usefixtures('set_of_news')
+def test_archive_query_uses_index(client):
+    url = reverse('news:archive')
+    cursor = client.get(url).context['page'].next_cursor
+    with CaptureQueriesContext(connection) as context:
+        client.get(url, {'cursor': cursor})
+    sql = next(
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and 'news_news' in query['sql']
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        plan = ' '.join(str(row) for row in cursor.fetchall())
+    assert 'USING INDEX news_date_id_idx' in plan
+
+
+@pytest.mark.usefixtures('set_of_comments')
+def test_comments_are_paginated(client, news_pk, settings):
+    settings.COMMENTS_COUNT_ON_PAGE = 5
+    expected = list(Comment.objects.values_list('pk', flat=True))
+    response = client.get(reverse('news:detail', args=news_pk))
+    comments = response.context['comments']
+    assert [comment.pk for comment in comments] == expected[:5]
+    fragment = client.get(
+        reverse('news:comments', args=news_pk),
+        {'cursor': comments.next_cursor}
+    )
+    assert [comment.pk for comment in fragment.context['comments']] == (
+        expected[5:10]
+    )
+
+
+def read_ndjson(response):
+    content = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.usefixtures('set_of_news', 'comment')
+def test_ndjson_feed_is_incremental(client, author, news, settings):
+    settings.FEED_BATCH_SIZE = 5
+    url = reverse('news:feed_ndjson')
+    records = read_ndjson(client.get(url))
+    assert sum(record['type'] == 'news' for record in records) == (
+        News.objects.count()
+    )
+    assert [record['id'] for record in records
+            if record['type'] == 'comment'] == [Comment.objects.get().pk]
+    since = records[-1]['since']
+    assert read_ndjson(client.get(url, {'since': since})) == []
+    Comment.objects.create(news=news, author=author, text='Ещё один')
+    changes = read_ndjson(client.get(url, {'since': since}))
+    assert [record['type'] for record in changes] == [
+        'news', 'comment', 'comment', 'cursor'
+    ]
+    assert changes[0]['id'] == news.pk
+
+
+@pytest.mark.usefixtures('set_of_news')
+def test_ndjson_feed_reports_deleted_news(client, settings):
+    settings.FEED_BATCH_SIZE = 3
+    url = reverse('news:feed_ndjson')
+    since = read_ndjson(client.get(url))[-1]['since']
+    deleted = list(News.objects.order_by('id').values_list('pk', flat=True))
+    News.objects.filter(pk__in=deleted[:4]).delete()
+    changed = News.objects.get(pk=deleted[4])
+    changed.save()
+    records = read_ndjson(client.get(url, {'since': since}))
+    changes = [
+        (record['type'], record['id']) for record in records
+        if record['type'] != 'cursor'
+    ]
+    assert sorted(changes[:4]) == [('deleted', pk) for pk in deleted[:4]]
+    assert changes[4:] == [('news', changed.pk)]
+    assert [record['type'] for record in records].count('cursor') == 2
+    assert read_ndjson(client.get(url, {'since': records[-1]['since']})) == []
+
+
+@pytest.mark.usefixtures('set_of_news')
+@pytest.mark.parametrize(
+    'name, item_tag',
+    (
+        ('news:feed_rss', 'channel/item'),
+        ('news:feed_atom', '{http://www.w3.org/2005/Atom}entry'),
+    ),
+)
+def test_xml_feeds(client, name, item_tag):
+    response = client.get(reverse(name))
+    root = ElementTree.fromstring(b''.join(response.streaming_content))
+    assert len(root.findall(item_tag)) == News.objects.count()
+
+
+def test_feed_rejects_broken_cursor(client):
+    response = client.get(reverse('news:feed_ndjson'), {'since': 'broken'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def search(client, query, **params):
+    response = client.get(reverse('news:search'), {'q': query, **params})
+    return response.context['page']
+
+
+def test_search_follows_news_changes(client, news):
+    news.text = 'Ученые обнаружили <b>редкую</b> комету'
+    news.save()
+    result, = search(client, 'комет')
+    assert result.news == news
+    assert '<mark>комету</mark>' in result.snippet
+    assert '&lt;b&gt;' in result.snippet
+    news.title = 'Новый заголовок'
+    news.text = 'Другой текст'
+    news.save()
+    assert not search(client, 'комета')
+    assert len(search(client, 'заголовок')) == 1
+    news.delete()
+    assert not search(client, 'заголовок')
+
+
+@pytest.mark.usefixtures('set_of_news')
+def test_search_pages(client, settings):
+    settings.NEWS_COUNT_ON_SEARCH_PAGE = 5
+    expected = News.objects.count()
+    found = []
+    page = search(client, 'новость')
+    while True:
+        found.extend(result.news.pk for result in page)
+        if not page.next_cursor:
+            break
+        page = search(client, 'новость', cursor=page.next_cursor)
+    assert len(found) == len(set(found)) == expected
+
+
+def test_rebuild_search_index(news):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO news_search(news_search) VALUES ('delete-all')"
+        )
+    call_command('rebuild_search_index', '--optimize')
+    assert [result.news for result in search_news('Заголовок')] == [news]
+
+
+@pytest.mark.usefixtures('set_of_news')
+def test_api_news_list(client, settings):
+    settings.NEWS_COUNT_ON_API_PAGE = 4
+    url = reverse('news:api_list')
+    expected = list(News.objects.values_list('pk', flat=True))
+    seen = []
+    data = client.get(url).json()
+    assert set(data['results'][0]) == {'id', 'title', 'date', 'comment_count'}
+    while True:
+        seen.extend(row['id'] for row in data['results'])
+        if not data['next']:
+            break
+        data = client.get(url, {'cursor': data['next']}).json()
+    assert seen == expected
+
+
+@pytest.mark.usefixtures('set_of_news')
+def test_api_selects_fields(client):
+    url = reverse('news:api_list')
+    with CaptureQueriesContext(connection) as context:
+        data = client.get(url, {'fields': 'title'}).json()
+    assert set(data['results'][0]) == {'title'}
+    assert '"text"' not in context.captured_queries[-1]['sql']
+    response = client.get(url, {'fields': 'title,password'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.usefixtures('set_of_comments')
+def test_api_news_detail(client, news, settings):
+    settings.COMMENTS_COUNT_ON_PAGE = 5
+    url = reverse('news:api_detail', args=(news.pk,))
+    expected = list(Comment.objects.values_list('pk', flat=True))
+    data = client.get(url).json()
+    assert data['title'] == news.title
+    comments = data['comments']
+    assert [row['id'] for row in comments['results']] == expected[:5]
+    comments = client.get(
+        url, {'fields': 'comments', 'cursor': comments['next']}
+    ).json()['comments']
+    assert [row['id'] for row in comments['results']] == expected[5:10]
+    only_news = client.get(url, {'fields': 'id,title'}).json()
+    assert only_news == {'id': news.pk, 'title': news.title}
+
+
+def test_api_news_detail_not_modified(client, news):
+    url = reverse('news:api_detail', args=(news.pk,))
+    etag = client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    missing = client.get(reverse('news:api_detail', args=(news.pk + 1,)))
+    assert missing.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.usefixtures('set_of_news')
+def test_home_does_not_load_news_text(client, news):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse('news:home'))
+    assert news.excerpt in response.content.decode()
+    assert not any(
+        '"news_news"."text"' in query['sql']
+        for query in context.captured_queries
+    )
@@ -1,12 +1,19 @@
 from http import HTTPStatus
+from importlib import import_module
 from random import choice
+from types import SimpleNamespace
+from unittest.mock import patch
 
 import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.forms import BAD_WORDS, WARNING, CommentForm
+from news.models import Comment, News
 
 pytestmark = pytest.mark.django_db
 
@@ -71,6 +78,24 @@ def test_author_can_edit_comment(
     assert comment.news == news
 
 
+def test_permalink_leads_to_page_with_comment(client, author, news, settings):
+    settings.COMMENTS_COUNT_ON_PAGE = 5
+    for index in range(12):
+        Comment.objects.create(news=news, author=author, text=f'{index}')
+    comment = Comment.objects.order_by('created', 'id')[10]
+    response = client.get(reverse('news:comment', args=[comment.pk]))
+    url, anchor = response.url.split('#')
+    assert '?cursor=' in url
+    assert anchor == f'comment-{comment.pk}'
+    page = client.get(url).context['comments']
+    assert page.object_list[0] == comment
+    first = Comment.objects.order_by('created', 'id')[4]
+    response = client.get(reverse('news:comment', args=[first.pk]))
+    assert response.url == (
+        reverse('news:detail', args=[news.pk]) + f'#comment-{first.pk}'
+    )
+
+
 def test_other_user_cant_edit_comment(
         admin_client,
         form_data,
@@ -112,3 +137,235 @@ def test_other_user_cant_delete_comment(
     count_after_deleting_comment = Comment.objects.count()
     assert (count_before_deleting_comment
             != count_after_deleting_comment) == status
+
+
+def test_comment_count_follows_comments(
+        admin_client,
+        author_client,
+        form_data,
+        comment,
+        news
+):
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    admin_client.post(reverse('news:detail', args=[news.pk]), data=form_data)
+    news.refresh_from_db()
+    assert news.comment_count == 2
+    author_client.post(reverse('news:delete', args=[comment.pk]))
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_recount_comments_command(comment, news):
+    News.objects.filter(pk=news.pk).update(comment_count=5)
+    with pytest.raises(CommandError):
+        call_command('recount_comments', '--check')
+    call_command('recount_comments')
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    call_command('recount_comments', '--check')
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        'Ты РЕДИСКА!',
+        'Ты pедиcка!',
+        'Какой негодяйчик',
+    ),
+)
+def test_bad_words_are_normalized(admin_client, news_pk, text):
+    response = admin_client.post(
+        reverse('news:detail', args=news_pk), data={'text': text}
+    )
+    assertFormError(response, form='form', field='text', errors=WARNING)
+    assert Comment.objects.count() == 0
+
+
+def test_bad_words_from_file(settings, tmp_path):
+    words = tmp_path / 'words.txt'
+    words.write_text('# комментарий\nёлки\nсвинья\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = words
+    settings.BAD_WORDS_WHOLE_WORDS = True
+    assert not CommentForm({'text': 'Свинья в апельсинах'}).is_valid()
+    assert not CommentForm({'text': 'Елки-палки'}).is_valid()
+    assert CommentForm({'text': 'Свиньям тут не место'}).is_valid()
+    assert CommentForm({'text': 'Редиска'}).is_valid()
+    assert set(import_module('news.forms').BAD_WORDS) == {'ёлки', 'свинья'}
+
+
+def test_import_news_jsonl(tmp_path, capsys):
+    source = tmp_path / 'news.jsonl'
+    source.write_text(
+        '{"title": "Первая", "text": "Текст", "date": "2022-01-02"}\n'
+        '{"title": "Без текста"}\n'
+        '\n'
+        '{"title": "Вторая", "text": "Текст"}\n'
+        '{"title": "Дата числом", "text": "Текст", "date": 20220102}\n',
+        encoding='utf-8'
+    )
+    call_command('import_news', str(source), '--batch-size', '1')
+    assert set(News.objects.values_list('title', flat=True)) == {
+        'Первая', 'Вторая'
+    }
+    errors = capsys.readouterr().err
+    assert 'Строка 2' in errors
+    assert 'Строка 5' in errors
+
+
+def test_import_news_csv_resumes_from_checkpoint(tmp_path):
+    source = tmp_path / 'news.csv'
+    source.write_text(
+        'title,text,date\n'
+        + ''.join(f'Новость {index},Текст,2022-01-0{index}\n'
+                  for index in range(1, 6)),
+        encoding='utf-8'
+    )
+    checkpoint = tmp_path / 'checkpoint.json'
+    checkpoint.write_text('{"rows": 3}')
+    call_command(
+        'import_news', str(source), '--checkpoint', str(checkpoint)
+    )
+    assert list(News.objects.values_list('title', flat=True)) == [
+        'Новость 5', 'Новость 4'
+    ]
+    assert checkpoint.read_text() == '{"rows": 5}'
+    assert {path.name for path in tmp_path.iterdir()} == {
+        'news.csv', 'checkpoint.json'
+    }
+
+
+def test_derived_fields_follow_text(author_client, comment, news):
+    news.text = ' '.join(f'слово{index}' for index in range(20))
+    news.save(update_fields=('text',))
+    news.refresh_from_db()
+    assert news.excerpt == ' '.join(
+        f'слово{index}' for index in range(15)
+    ) + ' …'
+    author_client.post(
+        reverse('news:edit', args=[comment.pk]),
+        {'text': '<b>Первая</b>\nвторая'}
+    )
+    comment.refresh_from_db()
+    assert comment.text_html == '&lt;b&gt;Первая&lt;/b&gt;<br>вторая'
+
+
+@pytest.mark.usefixtures('comment')
+def test_backfill_derived_fields(news):
+    News.objects.update(excerpt='')
+    Comment.objects.update(text_html='')
+    call_command('backfill_derived_fields', batch_size=1)
+    assert News.objects.get().excerpt == news.text
+    assert Comment.objects.get().text_html == 'Текст комментария'
+
+
+@pytest.mark.usefixtures('comment')
+def test_backfill_refreshes_changed_pages(client, news):
+    url = reverse('news:detail', args=[news.pk])
+    etag = client.get(url)['ETag']
+    Comment.objects.update(text_html='')
+    call_command('backfill_derived_fields')
+    response = client.get(url)
+    assert response['X-Page-Cache'] == 'miss'
+    assert response['ETag'] != etag
+    assert 'Текст комментария' in response.content.decode()
+
+
+def test_admin_deletes_comments_in_chunks(
+        admin_client,
+        author,
+        news,
+        monkeypatch
+):
+    monkeypatch.setattr('news.admin.DELETE_CHUNK_SIZE', 3)
+    for index in range(7):
+        Comment.objects.create(news=news, author=author, text=f'{index}')
+    kept = Comment.objects.first()
+    response = admin_client.post(
+        reverse('admin:news_comment_changelist'),
+        {
+            'action': 'delete_in_chunks',
+            '_selected_action': list(
+                Comment.objects.exclude(pk=kept.pk)
+                .values_list('pk', flat=True)
+            ),
+        },
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert list(Comment.objects.all()) == [kept]
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_admin_deletes_news_with_comments_in_chunks(
+        admin_client,
+        author,
+        news,
+        monkeypatch,
+        django_assert_max_num_queries
+):
+    monkeypatch.setattr('news.admin.DELETE_CHUNK_SIZE', 3)
+    for index in range(7):
+        Comment.objects.create(news=news, author=author, text=f'{index}')
+    data = {'action': 'delete_selected', '_selected_action': [news.pk]}
+    url = reverse('admin:news_news_changelist')
+    with django_assert_max_num_queries(8):
+        response = admin_client.post(url, data)
+    assert dict(response.context['model_count']) == {
+        'Новости': 1, 'comments': 7,
+    }
+    with patch('news.signals.purge_news_pages') as purge:
+        response = admin_client.post(url, {**data, 'post': 'yes'})
+    assert response.status_code == HTTPStatus.FOUND
+    assert not News.objects.exists()
+    assert not Comment.objects.exists()
+    # Сигналы комментариев не срабатывают, только удаление самой новости.
+    purge.assert_called_once_with(news.pk)
+
+
+def test_admin_filters_comments_by_news(admin_client, comment):
+    url = reverse('admin:news_comment_changelist')
+    response = admin_client.get(url, {'news__id__exact': comment.news_id})
+    assert list(response.context['cl'].result_list) == [comment]
+    response = admin_client.get(url, {'news__id__exact': 'x'})
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_seed(django_user_model):
+    call_command(
+        'seed', users=3, news=10, comments=50, batch_size=7, seed=1
+    )
+    assert django_user_model.objects.count() == 3
+    assert News.objects.count() == 10
+    assert Comment.objects.count() == 50
+    call_command('recount_comments', check=True)
+    assert all(news.excerpt for news in News.objects.all())
+
+
+def test_long_comment_is_stored_compressed(author_client, comment):
+    text = ' '.join(['Длинный комментарий к новости.'] * 100)
+    author_client.post(reverse('news:edit', args=[comment.pk]), {'text': text})
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT length(text), length(text_html) FROM news_comment '
+            'WHERE id = %s',
+            [comment.pk],
+        )
+        stored, stored_html = cursor.fetchone()
+    assert stored < len(text.encode('utf-8')) // 10
+    assert stored_html < len(text.encode('utf-8')) // 10
+    comment.refresh_from_db()
+    assert comment.text == text
+    assert comment.text_html == text
+    assert Comment.objects.filter(text=text).exists()
+
+
+@pytest.mark.usefixtures('comment')
+def test_migration_backfills_derived_fields(news):
+    migration = import_module('news.migrations.0010_backfill_derived_fields')
+    News.objects.update(excerpt='')
+    Comment.objects.update(text_html='')
+    editor = SimpleNamespace(connection=connection)
+    migration.backfill_derived_fields(apps, editor)
+    assert News.objects.get().excerpt == news.text
+    assert Comment.objects.get().text_html == 'Текст комментария'
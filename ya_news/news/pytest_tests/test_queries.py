@@ -0,0 +1,185 @@
+import json
+import logging
+from http import HTTPStatus
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from news.models import Comment, News
+from yanews.auth import check_shared_cache
+from yanews.sqlite import configure_sqlite
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.usefixtures('set_of_news', 'set_of_comments')
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', None),
+        ('news:archive', None),
+        ('news:detail', pytest.lazy_fixture('news_pk')),
+        ('news:comments', pytest.lazy_fixture('news_pk')),
+        ('news:edit', pytest.lazy_fixture('comment_pk')),
+        ('news:delete', pytest.lazy_fixture('comment_pk')),
+        ('news:api_list', None),
+        ('news:api_detail', pytest.lazy_fixture('news_pk')),
+    ),
+)
+def test_query_budget(author_client, assert_query_budget, name, args):
+    response = assert_query_budget(author_client, name, args)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_comment_creation_query_budget(
+        author_client,
+        form_data,
+        news_pk,
+        django_assert_max_num_queries
+):
+    with django_assert_max_num_queries(5):
+        author_client.post(reverse('news:detail', args=news_pk), form_data)
+
+
+def test_server_timing(client, news_pk, settings, caplog):
+    settings.SERVER_TIMING = True
+    with caplog.at_level(logging.INFO, logger='yanews.timing'):
+        response = client.get(reverse('news:detail', args=news_pk))
+    assert response['Server-Timing'].startswith('db;desc="3 queries"')
+    assert 'tpl;dur=' in response['Server-Timing']
+    record = json.loads(caplog.records[-1].message)
+    assert record['view'] == 'news:detail'
+    assert record['queries'] == 3
+
+
+def test_server_timing_is_opt_in(client, news_pk):
+    response = client.get(reverse('news:detail', args=news_pk))
+    assert not response.has_header('Server-Timing')
+
+
+@pytest.mark.parametrize(
+    'pragma, expected',
+    (
+        ('busy_timeout', 5000),
+        ('synchronous', 1),
+        ('temp_store', 2),
+        ('cache_size', -20000),
+    ),
+)
+def test_sqlite_pragmas_are_applied(pragma, expected):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {pragma}')
+        assert cursor.fetchone()[0] == expected
+
+
+@pytest.mark.parametrize(
+    'pragmas',
+    (
+        {'user_version': 1},
+        {'journal_mode': 'WAL; DROP TABLE news_news'},
+    ),
+)
+def test_bad_sqlite_pragmas_are_rejected(settings, pragmas):
+    settings.SQLITE_PRAGMAS = pragmas
+    with pytest.raises(ImproperlyConfigured):
+        configure_sqlite(sender=None, connection=connection)
+
+
+def test_logged_in_request_floor(
+        author_client,
+        news,
+        django_assert_num_queries
+):
+    url = reverse('users:login')
+    author_client.get(url)
+    with django_assert_num_queries(0):
+        author_client.get(url)
+    author_client.get(reverse('news:home'))
+    with django_assert_num_queries(0):
+        author_client.get(reverse('news:home'))
+
+
+def test_cached_user_is_invalidated(author, author_client):
+    url = reverse('news:home')
+    author_client.get(url)
+    author.username = 'Новое имя'
+    author.save()
+    assert 'Новое имя' in author_client.get(url).content.decode()
+    author.set_password('новый-пароль')
+    author.save()
+    assert not author_client.get(url).context['user'].is_authenticated
+
+
+def test_purge_sessions(author_client):
+    Session.objects.update(expire_date=timezone.now())
+    call_command('purge_sessions')
+    assert not Session.objects.exists()
+
+
+@pytest.mark.parametrize('comments', (5, 50))
+def test_admin_query_count_does_not_grow_with_thread(
+        admin_client,
+        author,
+        news,
+        comments,
+        django_assert_max_num_queries
+):
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(comments)
+    )
+    urls = (
+        reverse('admin:news_news_changelist'),
+        reverse('admin:news_news_change', args=(news.pk,)),
+        reverse('admin:news_comment_changelist')
+        + f'?news__id__exact={news.pk}',
+    )
+    for url in urls:
+        with django_assert_max_num_queries(8):
+            assert admin_client.get(url).status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize(
+    'name, with_pk',
+    (
+        ('news:home', False),
+        ('news:archive', False),
+        ('news:detail', True),
+        ('news:comments', True),
+        ('news:api_list', False),
+        ('news:api_detail', True),
+    ),
+)
+def test_query_budget_on_seeded_database(
+        seeded_db,
+        author_client,
+        assert_query_budget,
+        name,
+        with_pk
+):
+    # seeded_db стоит первым: клон снимка заменяет всю базу, и созданный
+    # раньше автор бы пропал.
+    args = None
+    if with_pk:
+        args = (News.objects.values_list('pk', flat=True).first(),)
+    response = assert_query_budget(author_client, name, args)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_shared_cache_is_required(settings):
+    settings.CACHES = {**settings.CACHES, 'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    assert [error.id for error in check_shared_cache(None)] == [
+        'yanews.E001'
+    ]
+    settings.AUTHENTICATION_BACKENDS = [
+        'django.contrib.auth.backends.ModelBackend'
+    ]
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    assert check_shared_cache(None) == []
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.urls import reverse
+
+from news.models import News
+from yanews.routers import (PRIMARY, REPLICA, STICKY_COOKIE,
+                            PrimaryReplicaRouter, use_primary)
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """
+    Реплика — отдельный файл SQLite, обновляемый командой sync_replica.
+
+    Чтобы запросы к реплике были разрешены, фикстуру с базой данных нужно
+    запросить раньше этой.
+    """
+    monkeypatch.setitem(connections.databases, REPLICA, {
+        **connections.databases[PRIMARY],
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    })
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+
+
+@pytest.mark.usefixtures('replica')
+def test_router_sends_news_reads_to_replica():
+    router = PrimaryReplicaRouter()
+    assert router.db_for_read(News) == REPLICA
+    assert router.db_for_read(get_user_model()) == PRIMARY
+    assert router.db_for_write(News) == PRIMARY
+    with use_primary():
+        assert router.db_for_read(News) == PRIMARY
+
+
+def test_router_without_replica():
+    assert PrimaryReplicaRouter().db_for_read(News) == PRIMARY
+
+
+def test_reads_follow_writes(
+        transactional_db,
+        replica,
+        client,
+        django_user_model
+):
+    news = News.objects.create(title='Заголовок', text='Текст')
+    call_command('sync_replica')
+    url = reverse('news:detail', args=[news.pk])
+    author = django_user_model.objects.create(username='Автор')
+    client.force_login(author)
+    response = client.get(url)
+    assert response.context['news']._state.db == REPLICA
+
+    response = client.post(url, {'text': 'Новый комментарий'}, follow=True)
+    assert STICKY_COOKIE in client.cookies
+    assert response.context['news']._state.db == PRIMARY
+    assert len(response.context['comments']) == 1
+
+    client.cookies.pop(STICKY_COOKIE)
+    response = client.get(url)
+    assert response.context['news']._state.db == REPLICA
+    assert len(response.context['comments']) == 0
+    call_command('sync_replica')
+    assert len(client.get(url).context['comments']) == 1
+
+
+def test_shared_cache_is_filled_from_primary(
+        transactional_db,
+        replica,
+        client,
+        django_user_model
+):
+    news = News.objects.create(title='Заголовок', text='Текст')
+    call_command('sync_replica')
+    news.comment_set.create(
+        text='Комментарий после синхронизации',
+        author=django_user_model.objects.create(username='Автор'),
+    )
+    url = reverse('news:detail', args=[news.pk])
+    response = client.get(url)
+    assert response['X-Page-Cache'] == 'miss'
+    assert response.context['news']._state.db == PRIMARY
+    assert len(response.context['comments']) == 1
+    cached = client.get(url)
+    assert cached['X-Page-Cache'] == 'hit'
+    assert 'Комментарий после синхронизации' in cached.content.decode()
+
+
+def test_api_detail_missing_on_replica(transactional_db, replica, client):
+    call_command('sync_replica')
+    news = News.objects.create(title='Заголовок', text='Текст')
+    url = reverse('news:api_detail', args=[news.pk])
+    response = client.get(url, {'fields': 'id,title,comments'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.usefixtures('comment')
+def test_data_migrations_use_migrated_database(db, replica, news):
+    """Реплика без таблиц: любой запрос к ней упал бы."""
+    News.objects.update(excerpt='')
+    editor = SimpleNamespace(connection=connections[PRIMARY])
+    import_module(
+        'news.migrations.0010_backfill_derived_fields'
+    ).backfill_derived_fields(apps, editor)
+    import_module(
+        'news.migrations.0011_compress_comment_text_html'
+    ).compress_html(apps, editor)
+    assert News.objects.using(PRIMARY).get().excerpt == news.text
@@ -10,10 +10,12 @@ from pytest_django.asserts import assertRedirects
     'name, args',
     (
         ('news:home', None),
+        ('news:archive', None),
         ('users:login', None),
         ('users:logout', None),
         ('users:signup', None),
         ('news:detail', pytest.lazy_fixture('news_pk')),
+        ('news:comments', pytest.lazy_fixture('news_pk')),
     ),
 )
 def test_pages_availability_for_anonymous_user(client, name, args):
@@ -0,0 +1,140 @@
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.db import connection, connections
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import News
+from .pagination import KeysetPage, dump_cursor, load_cursor
+
+SEARCH_TABLE = 'news_search'
+# Таблица FTS5 хранит только индекс, сами тексты берутся из news_news.
+CREATE_TABLE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+    "title, text, content='news_news', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+# Django пересоздаёт таблицу SQLite почти при любом изменении модели,
+# и триггеры при этом пропадают, поэтому они ставятся после каждой
+# миграции (см. install_search_triggers).
+TRIGGERS_SQL = (
+    f'CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert '
+    'AFTER INSERT ON news_news BEGIN '
+    f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+    f'CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete '
+    'AFTER DELETE ON news_news BEGIN '
+    f'INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    f'CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update '
+    'AFTER UPDATE OF title, text ON news_news BEGIN '
+    f'INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); "
+    f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+)
+# Заголовок весит больше текста.
+RANK = f'bm25({SEARCH_TABLE}, 10.0, 1.0)'
+# Служебные символы вместо тегов: текст экранируется уже после выборки.
+MARK_START, MARK_END = '\x02', '\x03'
+SEARCH_SQL = (
+    f'SELECT rowid, {RANK}, '
+    f"highlight({SEARCH_TABLE}, 0, '{MARK_START}', '{MARK_END}'), "
+    f"snippet({SEARCH_TABLE}, 1, '{MARK_START}', '{MARK_END}', '…', 16) "
+    f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s {{seek}}'
+    f'ORDER BY {RANK}, rowid LIMIT %s'
+)
+SEEK_SQL = f'AND ({RANK} > %s OR ({RANK} = %s AND rowid > %s)) '
+WORD = re.compile(r'\w+')
+
+
+def install_search_triggers(using=None, **kwargs):
+    """Обработчик post_migrate: восстанавливает триггеры индекса."""
+    db = connections[using or 'default']
+    if db.vendor != 'sqlite':
+        return
+    with db.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        for sql in TRIGGERS_SQL:
+            cursor.execute(sql)
+
+
+def rebuild_search_index():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def optimize_search_index():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"
+        )
+
+
+def build_match(query):
+    """
+    Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово ищется как префикс, все слова обязательны.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD.findall(query))
+
+
+def highlight(text):
+    return mark_safe(
+        escape(text)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+@dataclass
+class SearchResult:
+    news: News
+    rank: float
+    title: str
+    snippet: str
+
+
+def search_news(query, cursor=None, per_page=None):
+    """
+    Ищет новости по заголовку и тексту, лучшие совпадения первыми.
+
+    Страницы листаются по ключу (rank, rowid), курсор — next_cursor
+    предыдущей страницы.
+    """
+    per_page = per_page or settings.NEWS_COUNT_ON_SEARCH_PAGE
+    match = build_match(query)
+    if not match:
+        return KeysetPage()
+    params = [match]
+    seek = ''
+    if cursor:
+        try:
+            rank, rowid = load_cursor(cursor)
+            params += [float(rank), float(rank), int(rowid)]
+        except (TypeError, ValueError):
+            raise BadRequest('Некорректный курсор.')
+        seek = SEEK_SQL
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(
+            SEARCH_SQL.format(seek=seek), params + [per_page + 1]
+        )
+        rows = db_cursor.fetchall()
+    page = KeysetPage()
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last_rowid, last_rank = rows[-1][:2]
+        page.next_cursor = dump_cursor([last_rank, last_rowid])
+    news = News.objects.defer('text').in_bulk(row[0] for row in rows)
+    page.object_list = [
+        SearchResult(news[rowid], rank, highlight(title), highlight(snippet))
+        for rowid, rank, title, snippet in rows
+        if rowid in news
+    ]
+    return page
@@ -0,0 +1,80 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import purge_news_pages
+from .models import Comment, News, NewsTombstone
+
+_bulk_comment_changes = ContextVar('bulk_comment_changes', default=False)
+
+
+@contextmanager
+def bulk_comment_changes():
+    """
+    Внутри блока сигналы комментариев не трогают новости.
+
+    Счётчики, отметку updated и кеш страниц обновляет сам код,
+    меняющий комментарии пачкой.
+    """
+    token = _bulk_comment_changes.set(True)
+    try:
+        yield
+    finally:
+        _bulk_comment_changes.reset(token)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """
+    Увеличиваем счётчик комментариев новости при создании комментария.
+
+    Любое изменение комментария обновляет и отметку News.updated,
+    по которой строятся ETag и Last-Modified страницы новости.
+    """
+    if _bulk_comment_changes.get():
+        return
+    changes = {'updated': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    News.objects.filter(pk=instance.news_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшаем счётчик комментариев новости при удалении комментария.
+
+    Срабатывает и при каскадном удалении, и при удалении через админку.
+    """
+    if _bulk_comment_changes.get():
+        return
+    News.objects.filter(pk=instance.news_id).update(
+        comment_count=F('comment_count') - 1,
+        updated=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def purge_news_cache(sender, instance, **kwargs):
+    """Сбрасываем кеш страниц, на которых выводится новость."""
+    purge_news_pages(instance.pk)
+
+
+@receiver(post_delete, sender=News)
+def write_news_tombstone(sender, instance, **kwargs):
+    """Удаление новости попадает в выгрузку с курсором since."""
+    NewsTombstone.objects.create(id=instance.pk, updated=timezone.now())
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_cache(sender, instance, **kwargs):
+    """Сбрасываем кеш страниц, на которых выводится комментарий."""
+    if _bulk_comment_changes.get():
+        return
+    purge_news_pages(instance.news_id)
@@ -1,16 +1,41 @@
 from django.urls import path
 
-from news import views
+from news import api, feeds, views
 
 app_name = 'news'
 
 urlpatterns = [
     path('', views.NewsList.as_view(), name='home'),
+    path('archive/', views.NewsArchive.as_view(), name='archive'),
+    path('search/', views.NewsSearch.as_view(), name='search'),
     path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsComments.as_view(),
+        name='comments'
+    ),
+    path(
+        'comment/<int:pk>/',
+        views.CommentPermalink.as_view(),
+        name='comment'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path(
+        'feed/news.ndjson',
+        feeds.NewsNdjsonFeed.as_view(),
+        name='feed_ndjson'
+    ),
+    path('feed/rss/', feeds.NewsFeed.as_view(), name='feed_rss'),
+    path('feed/atom/', feeds.NewsAtomFeed.as_view(), name='feed_atom'),
+    path('api/news/', api.NewsListApi.as_view(), name='api_list'),
+    path(
+        'api/news/<int:pk>/',
+        api.NewsDetailApi.as_view(),
+        name='api_detail'
+    ),
 ]
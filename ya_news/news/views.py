@@ -2,13 +2,19 @@ from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .cache import AnonymousPageCacheMixin, cached_home_news
+from .conditional import news_etag, news_last_modified
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import KeysetPaginator
+from .search import search_news
 
 
-class NewsList(generic.ListView):
+class NewsList(AnonymousPageCacheMixin, generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
@@ -17,22 +23,99 @@ class NewsList(generic.ListView):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Вместо текста
+        выводится заранее посчитанный анонс, сам текст не загружается.
+        Выборка кешируется и сбрасывается вместе с кешем главной.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return cached_home_news(
+            lambda: self.model.objects.defer('text')[
+                :settings.NEWS_COUNT_ON_HOME_PAGE
+            ]
+        )
+
+
+class NewsArchive(generic.TemplateView):
+    """Архив новостей с постраничным выводом по ключу."""
+    template_name = 'news/archive.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        paginator = KeysetPaginator(
+            News.objects.defer('text', 'excerpt'),
+            News._meta.ordering,
+            settings.NEWS_COUNT_ON_ARCHIVE_PAGE,
+        )
+        context['page'] = paginator.get_page(self.request.GET.get('cursor'))
+        context['object_list'] = context['page'].object_list
+        return context
+
+
+def comments_paginator(news_pk):
+    return KeysetPaginator(
+        Comment.objects.filter(
+            news_id=news_pk
+        ).select_related('author').defer('text'),
+        Comment._meta.ordering,
+        settings.COMMENTS_COUNT_ON_PAGE,
+    )
+
 
+def comment_url(comment):
+    """Адрес страницы новости, на которой виден комментарий."""
+    url = reverse('news:detail', kwargs={'pk': comment.news_id})
+    cursor = comments_paginator(comment.news_id).cursor_for(comment)
+    if cursor:
+        url += f'?cursor={cursor}'
+    return f'{url}#comment-{comment.pk}'
 
-class NewsDetail(generic.DetailView):
+
+class CommentPermalink(generic.RedirectView):
+    """Постоянная ссылка на комментарий: ведёт на страницу, где он виден."""
+
+    def get_redirect_url(self, *args, **kwargs):
+        comment = get_object_or_404(
+            Comment.objects.only('news_id', 'created'), pk=kwargs['pk']
+        )
+        return comment_url(comment)
+
+
+class CommentsPageMixin:
+    """Добавляет в контекст одну страницу комментариев к новости."""
+
+    def get_comments_page(self, news_pk):
+        return comments_paginator(news_pk).get_page(
+            self.request.GET.get('cursor')
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comments_page(self.kwargs['pk'])
+        return context
+
+
+class NewsSearch(generic.TemplateView):
+    """Полнотекстовый поиск по новостям."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        context['page'] = search_news(
+            context['query'], self.request.GET.get('cursor')
+        )
+        return context
+
+
+class NewsDetail(
+        AnonymousPageCacheMixin,
+        CommentsPageMixin,
+        generic.DetailView
+):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
+        obj = get_object_or_404(self.model, pk=self.kwargs['pk'])
         return obj
 
     def get_context_data(self, **kwargs):
@@ -42,8 +125,23 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class NewsComments(CommentsPageMixin, generic.TemplateView):
+    """Фрагмент со следующей страницей комментариев к новости."""
+    template_name = 'includes/comments.html'
+
+    def get(self, request, *args, **kwargs):
+        get_object_or_404(News.objects.only('pk'), pk=self.kwargs['pk'])
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['news_pk'] = self.kwargs['pk']
+        return context
+
+
 class NewsComment(
         LoginRequiredMixin,
+        CommentsPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -63,12 +161,17 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
 
+    @method_decorator(condition(
+        etag_func=news_etag,
+        last_modified_func=news_last_modified,
+    ))
     def get(self, request, *args, **kwargs):
         view = NewsDetail.as_view()
         return view(request, *args, **kwargs)
@@ -83,14 +186,15 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
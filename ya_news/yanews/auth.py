@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.signals import user_logged_out
+from django.core import checks
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+USER_KEY = 'auth:user:{}'
+# Кеши, которые живут в памяти одного процесса.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def user_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который берёт пользователя сессии из кеша.
+
+    Вместе с SESSION_ENGINE = cached_db запрос авторизованного
+    пользователя не обращается к базе ни за сессией, ни за пользователем.
+    Смена пароля и любое другое сохранение пользователя сбрасывают кеш,
+    поэтому проверка хеша сессии видит актуальный пароль. Сброс виден
+    остальным воркерам, только если кеш у них общий, см. check_shared_cache.
+    Пользователи лежат в кеше сессий, а не страниц.
+    """
+
+    def get_user(self, user_id):
+        key = USER_KEY.format(user_id)
+        user = user_cache().get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache().set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def forget_cached_user(sender, instance, **kwargs):
+    user_cache().delete(USER_KEY.format(instance.pk))
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        user_cache().delete(USER_KEY.format(user.pk))
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Кеш сессий и пользователей не может быть своим у каждого процесса."""
+    uses_cache = (
+        'yanews.auth.CachedModelBackend' in settings.AUTHENTICATION_BACKENDS
+        or settings.SESSION_ENGINE.startswith(
+            'django.contrib.sessions.backends.cache'
+        )
+    )
+    if not uses_cache:
+        return []
+    errors = []
+    for alias in sorted({'default', settings.SESSION_CACHE_ALIAS}):
+        backend = settings.CACHES[alias]['BACKEND']
+        if backend in PROCESS_LOCAL_CACHES:
+            errors.append(checks.Error(
+                f'Кеш {alias!r} ({backend}) не общий для воркеров: выход '
+                'и смена пароля не сбросят сессию и пользователя '
+                'в других процессах.',
+                hint='Задайте CACHE_BACKEND: файловый кеш, memcached и т. п.',
+                id='yanews.E001',
+            ))
+    return errors
@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import \
+    FileBasedCache as BaseFileBasedCache
+
+
+class FileBasedCache(BaseFileBasedCache):
+    """
+    Файловый кеш с атомарным add.
+
+    В Django add — это has_key и set, и два воркера могут одновременно
+    решить, что ключа нет. Здесь запись появляется через os.link,
+    который не заменяет существующий файл, поэтому блокировку
+    перерисовки страницы получает ровно один процесс.
+    """
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._createdir()
+        fname = self._key_to_file(key, version)
+        # has_key удаляет просроченную запись, иначе link не пройдёт.
+        if self.has_key(key, version):  # noqa: W601
+            return False
+        self._cull()
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, 'wb') as file:
+                self._write_content(file, timeout, value)
+            os.link(tmp_path, fname)
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp_path)
+        return True
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,6 +22,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanews.middleware.ServerTimingMiddleware',
+    'yanews.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,12 +58,84 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплика включается переменной окружения REPLICA_DATABASE с путём к файлу.
+if os.getenv('REPLICA_DATABASE'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('REPLICA_DATABASE'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['yanews.routers.PrimaryReplicaRouter']
+REPLICA_APPS = {'news'}
+REPLICA_STICKY_SECONDS = 10
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yanews.timing': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+
+# Кеш общий для всех воркеров: в нём сессии, пользователи и страницы,
+# и сброс записи должен быть виден каждому процессу. Файловый кеш
+# работает без внешних сервисов на одной машине; на нескольких машинах
+# задайте CACHE_BACKEND и CACHE_LOCATION, SESSION_CACHE_LOCATION,
+# например memcached. Сессии и пользователи лежат в отдельном кеше,
+# чтобы вытеснение страниц не разлогинивало пользователей.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'yanews.cache.FileBasedCache')
+# Файловый кеш при переполнении удаляет треть случайных записей;
+# по умолчанию Django держит всего 300 файлов.
+CACHE_OPTIONS = (
+    {'MAX_ENTRIES': 100_000} if CACHE_BACKEND.endswith('FileBasedCache')
+    else {}
+)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', str(BASE_DIR / '.cache' / 'default')
+        ),
+        'OPTIONS': CACHE_OPTIONS,
+    },
+    'sessions': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'SESSION_CACHE_LOCATION', str(BASE_DIR / '.cache' / 'sessions')
+        ),
+        'KEY_PREFIX': 'sessions',
+        'OPTIONS': CACHE_OPTIONS,
+    },
+}
+SESSION_CACHE_ALIAS = 'sessions'
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
+AUTHENTICATION_BACKENDS = ['yanews.auth.CachedModelBackend']
+USER_CACHE_TIMEOUT = 300
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 
 LANGUAGE_CODE = 'ru'
 
@@ -80,3 +155,18 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+NEWS_COUNT_ON_ARCHIVE_PAGE = 10
+NEWS_COUNT_ON_SEARCH_PAGE = 10
+COMMENTS_COUNT_ON_PAGE = 20
+NEWS_COUNT_ON_API_PAGE = 50
+SERVER_TIMING = False
+
+PAGE_CACHE_TIMEOUT = 60
+PAGE_CACHE_GRACE = 30
+PAGE_CACHE_LOCK_TIMEOUT = 10
+
+BAD_WORDS_FILE = BASE_DIR / 'news' / 'bad_words.txt'
+BAD_WORDS_WHOLE_WORDS = False
+BAD_WORDS_HOMOGLYPHS = True
+
+FEED_BATCH_SIZE = 500
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# PRAGMA, которые можно задать в настройке SQLITE_PRAGMAS.
+ALLOWED_PRAGMAS = frozenset((
+    'journal_mode',
+    'busy_timeout',
+    'synchronous',
+    'mmap_size',
+    'cache_size',
+    'temp_store',
+    'wal_autocheckpoint',
+))
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Применяет SQLITE_PRAGMAS к каждому новому соединению с SQLite.
+
+    Вместе с CONN_MAX_AGE настройка выполняется один раз на время жизни
+    соединения, а не на каждый запрос.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    unknown = set(pragmas) - ALLOWED_PRAGMAS
+    if unknown:
+        raise ImproperlyConfigured(
+            f'Неизвестные PRAGMA в SQLITE_PRAGMAS: {", ".join(unknown)}'
+        )
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not str(value).lstrip('-').isalnum():
+                raise ImproperlyConfigured(
+                    f'Недопустимое значение PRAGMA {name}: {value!r}'
+                )
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,12 @@
+"""
+Бенчмарки YaNote.
+
+Запускаются из каталога ya_note как модули, например:
+python -m benchmarks.json_api
+"""
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+django.setup()
@@ -0,0 +1,86 @@
+"""
+Автосохранение: форма редактирования против PATCH в API.
+
+Каждая правка дописывает к тексту один символ:
+python -m benchmarks.autosave --edits 500
+"""
+import argparse
+import json
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from benchmarks.utils import temporary_database
+from notes.models import Note
+
+TEXT = 'Текст заметки, достаточно длинный для настоящего блокнота. ' * 200
+
+
+def edit_with_form(client, note, text):
+    client.post(
+        reverse('notes:edit', args=(note.slug,)),
+        {'title': note.title, 'text': text, 'slug': note.slug},
+    )
+
+
+def edit_with_patch(client, note, text):
+    etag = client.get(reverse('notes:api_detail', args=(note.slug,)))['ETag']
+    with CaptureQueriesContext(connection) as context:
+        started = perf_counter()
+        client.patch(
+            reverse('notes:api_detail', args=(note.slug,)),
+            json.dumps({'text': text}),
+            content_type='application/json',
+            HTTP_IF_MATCH=etag,
+        )
+        elapsed = perf_counter() - started
+    return elapsed, context
+
+
+def run(edit, edits):
+    author = get_user_model().objects.create(username=edit.__name__)
+    note = Note.objects.create(title='Заметка', text=TEXT, author=author)
+    client = Client()
+    client.force_login(author)
+    text = TEXT
+    elapsed = 0
+    queries = 0
+    written = 0
+    for _ in range(edits):
+        text += 'я'
+        if edit is edit_with_patch:
+            spent, context = edit(client, note, text)
+        else:
+            with CaptureQueriesContext(connection) as context:
+                started = perf_counter()
+                edit(client, note, text)
+                spent = perf_counter() - started
+        elapsed += spent
+        queries += len(context)
+        written += sum(
+            len(query['sql']) for query in context.captured_queries
+            if query['sql'].startswith('UPDATE')
+        )
+    return elapsed / edits * 1e3, queries / edits, written / edits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--edits', type=int, default=500)
+    args = parser.parse_args()
+    print(f'{"способ":<8} {"мс на правку":>13} {"запросов":>9} '
+          f'{"длина UPDATE":>13}')
+    with override_settings(ALLOWED_HOSTS=['*']), temporary_database():
+        for label, edit in (('форма', edit_with_form),
+                            ('PATCH', edit_with_patch)):
+            elapsed, queries, written = run(edit, args.edits)
+            print(f'{label:<8} {elapsed:>13.2f} {queries:>9.1f} '
+                  f'{written:>13.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Сжатые тексты заметок против несжатых: размер базы, чтение, запись.
+
+Холодное чтение — новое соединение с маленьким кешем страниц SQLite,
+читающее все тексты; объём прочитанного оценивается по числу страниц
+таблицы. Кеш ОС при этом не сбрасывается.
+python -m benchmarks.compressed_text --notes 2000 --size 20000
+"""
+import argparse
+import random
+from pathlib import Path
+from time import perf_counter
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+
+from benchmarks.utils import temporary_database
+from notes.models import Note
+
+WORDS = (
+    'заметка', 'список', 'покупки', 'встреча', 'проект', 'задача', 'идея',
+    'книга', 'фильм', 'рецепт', 'молоко', 'хлеб', 'отпуск', 'билеты',
+    'позвонить', 'написать', 'купить', 'прочитать', 'сделать', 'завтра',
+)
+# Страниц в кеше SQLite при холодном чтении.
+COLD_CACHE_PAGES = 16
+
+
+def make_text(rng, size):
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+
+def fill(count, size):
+    rng = random.Random(0)
+    author = get_user_model().objects.create(username='Автор')
+    started = perf_counter()
+    Note.objects.bulk_create(
+        (
+            Note(
+                title=f'Заметка {index}',
+                text=make_text(rng, size),
+                slug=f'note-{index}',
+                author=author,
+            )
+            for index in range(count)
+        ),
+        batch_size=500,
+    )
+    return perf_counter() - started
+
+
+def table_bytes():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name = 'notes_note'"
+        )
+        return cursor.fetchone()[0]
+
+
+def cold_read():
+    connections.close_all()
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA cache_size = {COLD_CACHE_PAGES}')
+    started = perf_counter()
+    for _ in Note.objects.values_list('text', flat=True).iterator():
+        pass
+    return perf_counter() - started
+
+
+def measure(count, size):
+    with temporary_database() as name:
+        write = fill(count, size)
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM')
+        table = table_bytes()
+        read = cold_read()
+        return {
+            'file': Path(name).stat().st_size,
+            'table': table,
+            'write': write,
+            'read': read,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=2000)
+    parser.add_argument(
+        '--size', type=int, default=20000, help='Символов в заметке.'
+    )
+    args = parser.parse_args()
+    field = Note._meta.get_field('text')
+    print(f'{"хранение":<10} {"файл, КБ":>10} {"таблица, КБ":>12} '
+          f'{"запись, мс":>11} {"чтение, мс":>11}')
+    for label, min_size in (('несжатое', float('inf')),
+                            ('zlib', field.min_size)):
+        with patch.object(field, 'min_size', min_size):
+            result = measure(args.notes, args.size)
+        print(f'{label:<10} {result["file"] // 1024:>10} '
+              f'{result["table"] // 1024:>12} '
+              f'{result["write"] * 1e3:>11.1f} {result["read"] * 1e3:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
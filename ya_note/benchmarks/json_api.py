@@ -0,0 +1,66 @@
+"""
+JSON API против HTML-страниц заметок пользователя.
+
+python -m benchmarks.json_api --repeat 5
+"""
+import argparse
+from timeit import timeit
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from benchmarks.utils import temporary_database
+from notes.models import Note
+
+SIZES = (1_000, 10_000)
+TEXT = 'Текст заметки, достаточно длинный для настоящего блокнота. ' * 20
+
+
+def fill(size):
+    author = get_user_model().objects.create(username='Автор')
+    Note.objects.bulk_create(
+        Note(
+            title=f'Заметка {index}',
+            text=TEXT,
+            slug=f'note-{index}',
+            author=author,
+        )
+        for index in range(size)
+    )
+    return author
+
+
+def measure(client, url, repeat):
+    assert client.get(url).status_code == 200
+    return timeit(lambda: client.get(url), number=repeat) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print(f'{"строк":>8} {"страница":<10} {"HTML, мс":>10} {"JSON, мс":>10}')
+    for size in SIZES:
+        with override_settings(ALLOWED_HOSTS=['*']), temporary_database():
+            client = Client()
+            client.force_login(fill(size))
+            slug = 'note-0'
+            pairs = {
+                'список': (reverse('notes:list'), reverse('notes:api_list')),
+                'заметка': (
+                    reverse('notes:detail', args=[slug]),
+                    reverse('notes:api_detail', args=[slug]),
+                ),
+            }
+            for name, (html_url, json_url) in pairs.items():
+                print(
+                    f'{size:>8} {name:<10} '
+                    f'{measure(client, html_url, args.repeat):>10.1f} '
+                    f'{measure(client, json_url, args.repeat):>10.1f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Нагрузочный прогон всех страниц YaNote на текущей базе.
+
+Сначала база заполняется командой seed, например:
+python manage.py seed --users 10000 --notes 1000000
+Затем запускается прогон, результат — JSON для сравнения запусков:
+python -m benchmarks.load --concurrency 1 4 16 --output run.json
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from benchmarks.utils import drive, peak_rss_kb
+from notes import urls
+from notes.models import Note
+
+
+def sample_urls():
+    """
+    Адрес для каждого имени из notes.urls.
+
+    Клиент входит от имени пользователя с наибольшим числом заметок:
+    его список заметок — самая тяжёлая страница.
+    """
+    busiest = Note.objects.values('author').annotate(
+        count=Count('pk')
+    ).order_by('-count').first()
+    if busiest is None:
+        sys.exit('База пуста: сначала выполните manage.py seed.')
+    note = Note.objects.filter(author_id=busiest['author']).select_related(
+        'author'
+    ).first()
+    result = {}
+    for pattern in urls.urlpatterns:
+        args = None
+        if 'slug' in pattern.pattern.converters:
+            args = [note.slug]
+        result[pattern.name] = reverse(
+            f'{urls.app_name}:{pattern.name}', args=args
+        )
+    return result, note.author
+
+
+def make_clients(count, user):
+    clients = []
+    for _ in range(count):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        clients.append(client)
+    return clients
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 4, 16]
+    )
+    parser.add_argument(
+        '--requests', type=int, default=20,
+        help='Запросов на каждого клиента.',
+    )
+    parser.add_argument('--names', nargs='+', help='Только эти имена URL.')
+    parser.add_argument(
+        '--anonymous', action='store_true',
+        help='Не входить на сайт; закрытые страницы ответят редиректом.',
+    )
+    parser.add_argument('--output', help='Файл для JSON; по умолчанию stdout.')
+    args = parser.parse_args()
+    report = {
+        'project': 'ya_note',
+        'started': datetime.now(timezone.utc).isoformat(),
+        'rows': {
+            'users': get_user_model().objects.count(),
+            'notes': Note.objects.count(),
+        },
+        'results': [],
+    }
+    with override_settings(ALLOWED_HOSTS=['*']):
+        targets, author = sample_urls()
+        user = None if args.anonymous else author
+        for name, url in targets.items():
+            if args.names and name not in args.names:
+                continue
+            for concurrency in args.concurrency:
+                stats = drive(
+                    make_clients(concurrency, user), url, args.requests
+                )
+                report['results'].append({
+                    'name': f'{urls.app_name}:{name}',
+                    'concurrency': concurrency,
+                    **stats,
+                })
+                print(
+                    f'{name:<12} x{concurrency:<3} '
+                    f'p50 {stats["p50_ms"]:>8.1f} мс  '
+                    f'p99 {stats["p99_ms"]:>8.1f} мс  '
+                    f'{stats["queries"]:>5.1f} запросов',
+                    file=sys.stderr,
+                )
+    report['peak_rss_kb'] = peak_rss_kb()
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
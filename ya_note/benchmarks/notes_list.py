@@ -0,0 +1,81 @@
+"""
+Стоимость страницы списка заметок в начале, середине и конце.
+
+При выборке по ключу время страницы не зависит ни от её номера,
+ни от числа заметок пользователя:
+python -m benchmarks.notes_list --repeat 20
+"""
+import argparse
+from timeit import timeit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from benchmarks.utils import temporary_database
+from notes.models import Note
+from notes.pagination import FORWARD, KeysetPaginator
+from notes.views import NotesList
+
+SIZES = (1_000, 10_000, 50_000)
+TEXT = 'Текст заметки, достаточно длинный для настоящего блокнота. ' * 20
+
+
+def fill(size):
+    author = get_user_model().objects.create(username='Автор')
+    Note.objects.bulk_create(
+        Note(
+            title=f'Заметка {index}',
+            text=TEXT,
+            slug=f'note-{index}',
+            author=author,
+        )
+        for index in range(size)
+    )
+    return author
+
+
+def cursor_at(author, position):
+    """Курсор на страницу, которая начинается после заметки position."""
+    if position == 0:
+        return ''
+    paginator = KeysetPaginator(
+        Note.objects.filter(author=author),
+        NotesList.ordering,
+        settings.NOTES_COUNT_ON_PAGE,
+    )
+    row = Note.objects.filter(author=author).order_by('id').values(
+        *paginator.fields
+    )[position - 1]
+    return paginator.encode_cursor(row, FORWARD)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    print(f'{"заметок":>8} {"начало, мс":>12} {"середина, мс":>14} '
+          f'{"конец, мс":>11}')
+    for size in SIZES:
+        with override_settings(ALLOWED_HOSTS=['*']), temporary_database():
+            author = fill(size)
+            client = Client()
+            client.force_login(author)
+            url = reverse('notes:list')
+            page = settings.NOTES_COUNT_ON_PAGE
+            timings = []
+            for position in (0, size // 2, size - page):
+                data = {'cursor': cursor_at(author, position)}
+                assert client.get(url, data).status_code == 200
+                elapsed = timeit(
+                    lambda: client.get(url, data), number=args.repeat
+                )
+                timings.append(elapsed / args.repeat * 1e3)
+            print(f'{size:>8} {timings[0]:>12.2f} {timings[1]:>14.2f} '
+                  f'{timings[2]:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+История правок: место на одну правку и время восстановления версии.
+
+Заметка правится --edits раз, каждая правка меняет одну строку.
+Размер истории сравнивается с хранением полной копии на каждую правку:
+python -m benchmarks.revisions --edits 10000
+"""
+import argparse
+import random
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from benchmarks.utils import percentile, temporary_database
+from notes.models import Note
+from notes.revisions import reconstruct
+
+LINES = 400
+SAMPLES = 500
+
+
+def table_bytes(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT SUM(pgsize) FROM dbstat WHERE name = %s', [table]
+        )
+        return cursor.fetchone()[0]
+
+
+def edit(note, edits, rng):
+    lines = [f'Строка заметки номер {index}.\n' for index in range(LINES)]
+    full_copies = 0
+    started = perf_counter()
+    for number in range(edits):
+        lines[rng.randrange(LINES)] = f'Правка {number}: {rng.random()}\n'
+        note.text = ''.join(lines)
+        full_copies += len(note.text.encode('utf-8'))
+        note.save()
+    return perf_counter() - started, full_copies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--edits', type=int, default=10_000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    with temporary_database():
+        note = Note.objects.create(
+            title='Заметка',
+            text='',
+            author=get_user_model().objects.create(username='Автор'),
+        )
+        elapsed, full_copies = edit(note, args.edits, rng)
+        history = table_bytes('notes_noterevision')
+        print(f'правка: {elapsed / args.edits * 1e3:.2f} мс, '
+              f'{history / args.edits:.0f} байт на правку в истории '
+              f'против {full_copies / args.edits:.0f} при полных копиях')
+        note = Note.objects.get(pk=note.pk)
+        latencies = []
+        for _ in range(SAMPLES):
+            number = rng.randint(1, note.version)
+            started = perf_counter()
+            reconstruct(note, number)
+            latencies.append((perf_counter() - started) * 1e3)
+        latencies.sort()
+        print(f'восстановление версии: p50 {percentile(latencies, 0.5):.2f} '
+              f'мс, p99 {percentile(latencies, 0.99):.2f} мс, '
+              f'максимум {latencies[-1]:.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+JSON API заметок.
+
+Ответы собираются из строк values(), набор полей задаётся параметром
+?fields=slug,title. Если установлен orjson, он используется для
+сериализации, иначе — стандартный json. Заметку можно частично
+изменить запросом PATCH с заголовком If-Match.
+"""
+import json
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest
+from django.forms import modelform_factory
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import quote_etag
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .forms import NoteForm
+from .models import Note, VersionConflict
+from .pagination import KeysetPaginator
+from .sync import changes_since
+from .views import NotesList, note_etag, version_etag
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NOTE_FIELDS = ('id', 'title', 'text', 'slug', 'version')
+# В списке по умолчанию нет текста заметки.
+NOTE_LIST_FIELDS = ('slug', 'title', 'version')
+NOTE_EDITABLE_FIELDS = NoteForm.Meta.fields
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(
+        data, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+class JsonRowsResponse(HttpResponse):
+    """Ответ с данными, сериализованными функцией dumps."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(dumps(data), **kwargs)
+
+
+def select_fields(request, allowed, default):
+    """
+    Поля из параметра ?fields= в порядке запроса.
+
+    Без параметра возвращается набор по умолчанию, неизвестное поле
+    превращается в ответ 400.
+    """
+    raw = request.GET.get('fields')
+    if raw is None:
+        return default
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = set(fields) - set(allowed)
+    if not fields or unknown:
+        raise BadRequest(
+            'Доступные поля: {}.'.format(', '.join(allowed))
+        )
+    return fields
+
+
+class NoteApiBase(LoginRequiredMixin, generic.View):
+    """Заметки только автора; анониму — 403 вместо редиректа."""
+    raise_exception = True
+
+    def get_queryset(self):
+        return Note.objects.filter(author=self.request.user)
+
+
+class NotesListApi(NoteApiBase):
+    """Заметки пользователя без текста, постранично по ключу."""
+
+    def get(self, request):
+        fields = select_fields(request, NOTE_FIELDS, NOTE_LIST_FIELDS)
+        ordering = NotesList.ordering
+        paginator = KeysetPaginator(
+            self.get_queryset().values(*dict.fromkeys((*fields, *ordering))),
+            ordering,
+            settings.NOTES_COUNT_ON_PAGE,
+        )
+        page = paginator.get_page(request.GET.get('cursor'))
+        return JsonRowsResponse({
+            'results': [
+                {name: row[name] for name in fields} for row in page
+            ],
+            'next': page.next_cursor,
+            'previous': page.prev_cursor,
+        })
+
+
+def load_changes(request, note):
+    """Поля из тела запроса, значения которых отличаются от заметки."""
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        raise BadRequest('Тело запроса — не JSON.')
+    if not isinstance(data, dict) or set(data) - set(NOTE_EDITABLE_FIELDS):
+        raise BadRequest('Изменяемые поля: {}.'.format(
+            ', '.join(NOTE_EDITABLE_FIELDS)
+        ))
+    return {
+        name: value for name, value in data.items()
+        if value != getattr(note, name)
+    }
+
+
+class NotesSyncApi(NoteApiBase):
+    """
+    Изменения заметок после курсора ?cursor= из прошлого ответа.
+
+    Пока more истинно, клиент сразу запрашивает следующую порцию.
+    """
+
+    def get(self, request):
+        page = changes_since(request.user, request.GET.get('cursor'))
+        return JsonRowsResponse({
+            'changes': page.changes,
+            'cursor': page.cursor,
+            'more': page.more,
+        })
+
+
+class NoteDetailApi(NoteApiBase):
+    """Заметка целиком; PATCH меняет только переданные поля."""
+
+    @method_decorator(condition(etag_func=note_etag))
+    def get(self, request, slug):
+        fields = select_fields(request, NOTE_FIELDS, NOTE_FIELDS)
+        data = self.get_queryset().filter(slug=slug).values(*fields).first()
+        if data is None:
+            raise Http404
+        return JsonRowsResponse(data)
+
+    def patch(self, request, slug):
+        """
+        Проверяются и записываются только изменившиеся поля.
+
+        If-Match с ETag заметки обязателен: изменения поверх чужой
+        правки отклоняются ответом 412.
+        """
+        if 'HTTP_IF_MATCH' not in request.META:
+            return HttpResponse(status=428)
+        note = get_object_or_404(self.get_queryset(), slug=slug)
+        etag = quote_etag(version_etag(note.pk, note.version))
+        if etag not in parse_etags(request.META['HTTP_IF_MATCH']):
+            return HttpResponse(status=412)
+        changes = load_changes(request, note)
+        if changes:
+            form_class = modelform_factory(
+                Note, form=NoteForm, fields=tuple(changes)
+            )
+            form = form_class(changes, instance=note)
+            if not form.is_valid():
+                return JsonRowsResponse(
+                    {'errors': form.errors.get_json_data()}, status=400
+                )
+            try:
+                form.instance.save(
+                    update_fields=(*changes, 'version'),
+                    expected_version=note.version,
+                )
+            except VersionConflict:
+                return HttpResponse(status=412)
+        response = JsonRowsResponse(
+            {name: getattr(note, name) for name in NOTE_FIELDS}
+        )
+        response['ETag'] = quote_etag(version_etag(note.pk, note.version))
+        return response
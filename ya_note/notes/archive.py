@@ -0,0 +1,198 @@
+"""
+Импорт и экспорт заметок: zip-архив Markdown-файлов или JSONL.
+
+Импорт читает источник лениво и вставляет заметки пачками через
+bulk_create, каждую пачку — в своей транзакции. Поэтому загрузка
+файла сначала целиком проверяет источник и только потом пишет в базу.
+Экспорт отдаёт архив по частям, по мере чтения заметок из базы.
+"""
+import json
+import zipfile
+import zlib
+from itertools import islice
+from pathlib import PurePosixPath
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .models import SLUG_ATTEMPTS, Note, SyncCounter
+from .slugs import assign_slugs
+
+IMPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 500
+# Файлы больше этого размера в архиве не распаковываются.
+MAX_NOTE_SIZE = 1024 * 1024
+TITLE_PREFIX = '# '
+
+
+def note_to_markdown(title, text):
+    return f'{TITLE_PREFIX}{title}\n\n{text}\n'
+
+
+def markdown_to_note(name, content):
+    """Заголовок — из первой строки «# …», иначе из имени файла."""
+    first, _, rest = content.partition('\n')
+    if first.startswith(TITLE_PREFIX):
+        return {'title': first[len(TITLE_PREFIX):].strip(),
+                'text': rest.strip()}
+    return {'title': PurePosixPath(name).stem, 'text': content.strip()}
+
+
+def read_zip(file):
+    """Лениво перечисляет заметки из .md-файлов архива."""
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        raise ValidationError('Файл не является zip-архивом.')
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith('.md'):
+                continue
+            if info.file_size > MAX_NOTE_SIZE:
+                raise ValidationError(
+                    f'{info.filename}: файл больше {MAX_NOTE_SIZE} байт.'
+                )
+            try:
+                data = archive.read(info)
+            except (zipfile.BadZipFile, zlib.error, EOFError,
+                    NotImplementedError):
+                raise ValidationError(
+                    f'{info.filename}: файл в архиве повреждён.'
+                )
+            try:
+                content = data.decode('utf-8')
+            except UnicodeDecodeError:
+                raise ValidationError(
+                    f'{info.filename}: ожидался текст в UTF-8.'
+                )
+            yield markdown_to_note(info.filename, content)
+
+
+def read_jsonl(file):
+    """
+    Лениво перечисляет заметки из строк JSON вида {"title", "text"}.
+
+    slug из файла не используется: адреса подбираются заново.
+    """
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise ValidationError(f'Строка {number}: некорректный JSON.')
+        if not isinstance(row, dict) or not isinstance(row.get('text'), str):
+            raise ValidationError(f'Строка {number}: нет поля text.')
+        yield {'title': str(row.get('title') or ''), 'text': row['text']}
+
+
+def build_notes(author, rows):
+    title_field = Note._meta.get_field('title')
+    return [
+        Note(
+            title=row['title'][:title_field.max_length] or title_field.default,
+            text=row['text'],
+            author=author,
+        )
+        for row in rows
+    ]
+
+
+def insert_batch(notes):
+    """
+    Подбирает slug всей пачке одним запросом и вставляет её.
+
+    Если slug успели занять параллельно, пачка получает slug заново.
+    Номера в журнале изменений выдаются всей пачке сразу.
+    """
+    for attempt in range(SLUG_ATTEMPTS):
+        assign_slugs(notes)
+        try:
+            with transaction.atomic():
+                versions = SyncCounter.allocate(notes[0].author_id, len(notes))
+                for note, version in zip(notes, versions):
+                    note.sync_version = version
+                Note.objects.bulk_create(notes)
+            return
+        except IntegrityError:
+            if attempt == SLUG_ATTEMPTS - 1:
+                raise
+            for note in notes:
+                note.slug = ''
+
+
+def import_notes(author, rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Загружает заметки пачками; возвращает их число.
+
+    Ошибка в источнике прерывает импорт, уже загруженные пачки остаются.
+    """
+    rows = iter(rows)
+    imported = 0
+    while True:
+        batch = build_notes(author, islice(rows, batch_size))
+        if not batch:
+            return imported
+        insert_batch(batch)
+        imported += len(batch)
+
+
+def import_file(author, read, file, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Проверяет весь файл и только затем загружает из него заметки.
+
+    Файл читается дважды, зато ошибка в его конце не оставляет в базе
+    половину импорта, а память не зависит от размера файла.
+    """
+    for _ in read(file):
+        pass
+    file.seek(0)
+    return import_notes(author, read(file), batch_size)
+
+
+class StreamBuffer:
+    """Файл только для записи, содержимое которого забирают по частям."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def export_rows(queryset):
+    return queryset.order_by('id').values_list(
+        'title', 'slug', 'text'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def export_zip(queryset):
+    """
+    Архив, который пишется по мере чтения заметок.
+
+    zipfile умеет писать в поток без seek: размеры файлов попадают
+    в дескрипторы после данных.
+    """
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for title, slug, text in export_rows(queryset):
+            archive.writestr(f'{slug}.md', note_to_markdown(title, text))
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def export_jsonl(queryset):
+    for title, slug, text in export_rows(queryset):
+        yield json.dumps(
+            {'title': title, 'slug': slug, 'text': text},
+            ensure_ascii=False,
+        ) + '\n'
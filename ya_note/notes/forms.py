@@ -1,10 +1,14 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from pytils.translit import slugify
 
 from .models import Note
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
+CONFLICT = (
+    'Заметку изменили после того, как вы открыли её для редактирования. '
+    'Обновите страницу, чтобы увидеть новую версию.'
+)
+IMPORT_EXTENSIONS = ('.zip', '.jsonl')
 
 
 class NoteForm(forms.ModelForm):
@@ -15,14 +19,53 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
+        """
+        Обрабатывает случай, если slug не уникален.
+
+        Пустой slug не проверяется: свободный адрес подберёт Note.save.
+        Неизменённый slug заметки тоже не проверяется.
+        """
+        slug = self.cleaned_data.get('slug')
         if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
+            return ''
+        if slug == self.instance.slug:
+            return slug
         if Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+    def validate_unique(self):
+        """slug — единственное уникальное поле, его проверил clean_slug."""
+
+
+class NoteEditForm(NoteForm):
+    """
+    Форма редактирования: несёт версию, которую видел пользователь.
+
+    Без версии в запросе заметка перезаписывается как раньше.
+    """
+    version = forms.IntegerField(
+        required=False, min_value=1, widget=forms.HiddenInput
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['version'].initial = self.instance.version
+
+
+class NotesImportForm(forms.Form):
+    """Загрузка заметок из архива."""
+    file = forms.FileField(
+        label='Файл',
+        help_text='Zip-архив Markdown-файлов (.md) или JSONL (.jsonl)',
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.endswith(IMPORT_EXTENSIONS):
+            raise ValidationError(
+                'Поддерживаются файлы {}.'.format(', '.join(IMPORT_EXTENSIONS))
+            )
+        return file
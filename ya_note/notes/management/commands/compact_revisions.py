@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from notes.models import Note, NoteRevision
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет старые версии заметок, оставляя у каждой заметки '
+        'последние --keep версий.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=1000,
+            help='Сколько последних версий оставить каждой заметке.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько заметок обрабатывать в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        if options['keep'] < 0:
+            raise CommandError('Число версий не может быть отрицательным.')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        deleted = compact(options['keep'], options['batch_size'])
+        self.stdout.write(f'Удалено версий: {deleted}.')
+
+
+def compact(keep, batch_size):
+    """
+    Обходит заметки пачками по первичному ключу.
+
+    Дельта версии ссылается только на более новые версии, поэтому
+    удаление самых старых не ломает восстановление оставшихся.
+    """
+    notes = Note.objects.order_by('pk').values_list('pk', flat=True)
+    last_pk = 0
+    deleted = 0
+    while True:
+        batch = list(notes.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return deleted
+        last_pk = batch[-1]
+        with transaction.atomic():
+            count, _ = NoteRevision.objects.filter(
+                note__in=batch, number__lte=F('note__version') - keep - 1
+            ).delete()
+        deleted += count
@@ -0,0 +1,118 @@
+import random
+from itertools import islice
+from secrets import token_hex
+from time import monotonic
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from notes.models import Note
+
+# Пароль всех сгенерированных пользователей.
+SEED_PASSWORD = 'seed-password'
+WORDS = (
+    'купить', 'позвонить', 'встреча', 'проект', 'список', 'идея',
+    'книга', 'отпуск', 'ремонт', 'подарок', 'рецепт', 'план', 'отчёт',
+    'письмо', 'врач', 'спорт', 'курс', 'дача', 'билеты', 'счета',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей и заметки пачками через bulk_create, '
+        'например для нагрузочных бенчмарков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument(
+            '--notes',
+            type=int,
+            default=10000,
+            help='Всего заметок; делятся между пользователями неравномерно.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора: одинаковые запуски дают одни данные.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        if options['users'] < 1 and options['notes']:
+            raise CommandError('Заметкам нужен хотя бы один автор.')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # Метка запуска не зависит от зерна: повторный запуск с тем же
+        # зерном не столкнётся с уже созданными именами и slug.
+        self.tag = token_hex(4)
+        user_ids = self.create_users(options['users'])
+        self.create_notes(user_ids, options['notes'])
+
+    def bulk_create(self, model, objects, total, label):
+        """Вставляет объекты пачками, каждую — в своей транзакции."""
+        started = monotonic()
+        done = 0
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            done += len(batch)
+            elapsed = monotonic() - started
+            self.stdout.write(
+                f'{label}: {done} из {total}, '
+                f'{done / elapsed if elapsed else 0:.0f} в секунду'
+            )
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize()
+
+    def create_users(self, count):
+        user_model = get_user_model()
+        password = make_password(SEED_PASSWORD)
+        first = user_model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        self.bulk_create(user_model, (
+            user_model(username=f'seed-{self.tag}-{index}', password=password)
+            for index in range(count)
+        ), count, 'пользователи')
+        return list(user_model.objects.filter(pk__gt=first).values_list(
+            'pk', flat=True
+        ))
+
+    def note_counts(self, users, notes):
+        """
+        Делит заметки между пользователями по распределению Парето:
+        у немногих пользователей тысячи заметок, у большинства — единицы.
+        """
+        weights = [self.rng.paretovariate(1.2) for _ in range(users)]
+        total = sum(weights)
+        counts = [int(notes * weight / total) for weight in weights]
+        if counts:
+            counts[0] += notes - sum(counts)
+        return counts
+
+    def create_notes(self, user_ids, count):
+        counts = self.note_counts(len(user_ids), count)
+
+        def generate():
+            index = 0
+            for author_id, notes in zip(user_ids, counts):
+                for _ in range(notes):
+                    index += 1
+                    yield Note(
+                        title=self.text(3)[:100],
+                        text=self.text(self.rng.randint(5, 200)),
+                        slug=f'seed-{self.tag}-{index}',
+                        author_id=author_id,
+                    )
+
+        self.bulk_create(Note, generate(), count, 'заметки')
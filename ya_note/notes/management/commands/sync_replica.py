@@ -0,0 +1,42 @@
+import sqlite3
+from contextlib import closing
+from time import sleep
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from yanote.routers import PRIMARY, REPLICA
+
+
+def copy_database(source, target_name):
+    """Копирует базу SQLite целиком через backup API."""
+    with closing(sqlite3.connect(target_name)) as target:
+        source.backup(target)
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплику. '
+        'Заменяет репликацию при локальной разработке и в тестах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять синхронизацию каждые N секунд.',
+        )
+
+    def handle(self, *args, **options):
+        if REPLICA not in connections.databases:
+            raise CommandError(f'База {REPLICA} не настроена.')
+        primary = connections[PRIMARY]
+        primary.ensure_connection()
+        target_name = connections.databases[REPLICA]['NAME']
+        while True:
+            copy_database(primary.connection, target_name)
+            self.stdout.write(f'Реплика {target_name} обновлена.')
+            if not options['interval']:
+                return
+            sleep(options['interval'])
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:21
+
+from django.db import migrations, models
+import notes.fields
+
+BATCH_SIZE = 500
+
+
+def rewrite_texts(apps, alias, field):
+    """Перезаписывает тексты пачками по первичному ключу."""
+    objects = apps.get_model('notes', 'Note').objects.using(alias)
+    last_pk = 0
+    while True:
+        batch = list(
+            objects.filter(pk__gt=last_pk).only('pk', 'text')
+            .order_by('pk')[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        if field is not None:
+            for note in batch:
+                note.text = models.Value(note.text, output_field=field)
+        objects.bulk_update(batch, ['text'])
+        last_pk = batch[-1].pk
+
+
+def compress_texts(apps, schema_editor):
+    rewrite_texts(apps, schema_editor.connection.alias, None)
+
+
+def decompress_texts(apps, schema_editor):
+    # Пишем обычные строки в обход сжатия: потом столбец снова станет TEXT.
+    rewrite_texts(apps, schema_editor.connection.alias, models.TextField())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=notes.fields.CompressedTextField(help_text='Добавьте подробностей', verbose_name='Текст'),
+        ),
+        migrations.RunPython(compress_texts, decompress_texts),
+    ]
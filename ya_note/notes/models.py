@@ -1,6 +1,16 @@
 from django.conf import settings
-from django.db import models
-from pytils.translit import slugify
+from django.db import IntegrityError, models, transaction
+
+from .fields import CompressedTextField
+from .revisions import record_revision
+from .slugs import allocate_slug
+
+# Сколько раз выбирать slug заново, если его успели занять.
+SLUG_ATTEMPTS = 3
+
+
+class VersionConflict(Exception):
+    """Заметку изменили после того, как её прочитал клиент."""
 
 
 class Note(models.Model):
@@ -10,7 +20,7 @@ class Note(models.Model):
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    text = CompressedTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -26,12 +36,172 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Номер последнего изменения в журнале автора, см. SyncCounter.
+    sync_version = models.PositiveBigIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+            models.Index(
+                fields=('author', 'sync_version', 'id'),
+                name='note_author_sync_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        note = super().from_db(db, field_names, values)
+        note.remember_revision()
+        return note
+
+    def remember_revision(self):
+        """Запоминает загруженные заголовок и текст для истории правок."""
+        loaded = self.get_deferred_fields().isdisjoint(('title', 'text'))
+        self._revision = (self.title, self.text) if loaded else None
+
+    def save(self, *args, expected_version=None, **kwargs):
+        """
+        Версия растёт, только если изменились заголовок или текст:
+        у каждой прежней версии есть своя запись в истории правок.
+
+        expected_version включает оптимистичную блокировку: UPDATE
+        сработает, только если версия в базе всё ещё равна ей, иначе
+        VersionConflict.
+        """
+        previous = None
+        if self.pk is not None:
+            previous = getattr(self, '_revision', None)
+            if previous is None:
+                previous = type(self).objects.filter(
+                    pk=self.pk
+                ).values_list('title', 'text').first()
+        changed = previous is not None and previous != (self.title, self.text)
+        if changed:
+            self.version += 1
+        self._expected_version = expected_version
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {*update_fields, 'sync_version'}
+            if changed:
+                update_fields.add('version')
+            kwargs['update_fields'] = update_fields
+        try:
+            with transaction.atomic():
+                self.sync_version = SyncCounter.allocate(self.author_id)[0]
+                self.save_with_slug(*args, **kwargs)
+                if changed:
+                    record_revision(self, self.version - 1, *previous)
+        except VersionConflict:
+            if changed:
+                self.version -= 1
+            raise
+        finally:
+            self._expected_version = None
+        self.remember_revision()
+
+    def _do_update(self, base_qs, *args, **kwargs):
+        if getattr(self, '_expected_version', None) is None:
+            return super()._do_update(base_qs, *args, **kwargs)
+        base_qs = base_qs.filter(version=self._expected_version)
+        if not super()._do_update(base_qs, *args, **kwargs):
+            raise VersionConflict
+        return True
+
+    def save_with_slug(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = allocate_slug(type(self), self.title, self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                taken = type(self).objects.filter(
+                    slug=self.slug
+                ).exclude(pk=self.pk).exists()
+                if not taken or attempt == SLUG_ATTEMPTS - 1:
+                    self.slug = ''
+                    raise
+
+
+class NoteRevision(models.Model):
+    """
+    Прежняя версия заметки: целиком или дельтой к следующей версии.
+
+    Формат data описан в notes.revisions.
+    """
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+    )
+    number = models.PositiveIntegerField()
+    title = models.CharField(max_length=100)
+    is_snapshot = models.BooleanField(default=False)
+    data = CompressedTextField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'number'), name='note_revision_number_uniq'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.note_id} v{self.number}'
+
+
+class SyncCounter(models.Model):
+    """
+    Последний номер в журнале изменений заметок пользователя.
+
+    Номер выдаётся под блокировкой строки счётчика, которая держится
+    до конца транзакции, поэтому изменения получают номера в порядке
+    фиксации и клиент, запомнивший номер, не пропустит ни одного.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    value = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def allocate(cls, user_id, count=1):
+        """Следующие count номеров; вызывается внутри транзакции."""
+        counter = cls.objects.filter(user_id=user_id)
+        if not counter.update(value=models.F('value') + count):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(user_id=user_id, value=count)
+            except IntegrityError:
+                counter.update(value=models.F('value') + count)
+        last = counter.values_list('value', flat=True).get()
+        return range(last - count + 1, last + 1)
+
+
+class NoteTombstone(models.Model):
+    """Запись журнала об удалённой заметке."""
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    note_id = models.BigIntegerField()
+    slug = models.SlugField(max_length=100)
+    sync_version = models.PositiveBigIntegerField()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'sync_version', 'id'),
+                name='tombstone_author_sync_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.slug} v{self.sync_version}'
@@ -0,0 +1,139 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional
+
+from django.core.exceptions import BadRequest, ValidationError
+from django.db.models import Q
+
+FORWARD = 'a'
+BACKWARD = 'b'
+
+
+def _isoformat(value):
+    """В отличие от DjangoJSONEncoder сохраняет микросекунды."""
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'Тип {type(value).__name__} не поддерживается.')
+
+
+def dump_cursor(data):
+    """Упаковывает данные курсора в непрозрачную строку для URL."""
+    raw = json.dumps(data, default=_isoformat)
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def load_cursor(cursor):
+    """Распаковывает курсор; ValueError, если строка повреждена."""
+    try:
+        return json.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (BinasciiError, UnicodeDecodeError) as error:
+        raise ValueError(cursor) from error
+
+
+@dataclass
+class KeysetPage:
+    """Страница выборки с курсорами на соседние страницы."""
+    object_list: List = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу (keyset), а не по OFFSET.
+
+    Порядок задаётся кортежем полей в формате order_by, последнее поле
+    должно быть уникальным. Стоимость любой страницы одинакова: выборка
+    всегда начинается с поиска по индексу, а не с пропуска строк.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        if isinstance(obj, dict):
+            values = [obj[name] for name in self.fields]
+        else:
+            values = [getattr(obj, name) for name in self.fields]
+        return dump_cursor([direction, values])
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, values = load_cursor(cursor)
+            if direction not in (FORWARD, BACKWARD):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            model = self.queryset.model
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+            # Поля ключа не бывают NULL: с None условие _seek не строится.
+            if None in values:
+                raise ValueError(values)
+        except (TypeError, ValueError, ValidationError):
+            raise BadRequest('Некорректный курсор.')
+        return direction, values
+
+    def _seek(self, values, backward):
+        """Условие «строго после курсора» в заданном направлении."""
+        lookups = [
+            'lt' if descending != backward else 'gt'
+            for descending in self.descending
+        ]
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            step = Q(**{f'{name}__{lookups[index]}': values[index]})
+            for prev_name, prev_value in zip(self.fields, values[:index]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        # Нестрогое условие по первому полю помогает планировщику
+        # сразу выбрать диапазон индекса.
+        first = {f'{self.fields[0]}__{lookups[0]}e': values[0]}
+        return Q(**first) & condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу, следующую за курсором или перед ним."""
+        queryset = self.queryset.order_by(*self.ordering)
+        backward = False
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            backward = direction == BACKWARD
+            queryset = self.queryset.filter(self._seek(values, backward))
+            if backward:
+                queryset = queryset.order_by(*self._reversed_ordering())
+            else:
+                queryset = queryset.order_by(*self.ordering)
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if backward:
+            items.reverse()
+        page = KeysetPage(items)
+        if not items:
+            return page
+        if has_more or backward:
+            page.next_cursor = self.encode_cursor(items[-1], FORWARD)
+        if (has_more and backward) or (cursor and not backward):
+            page.prev_cursor = self.encode_cursor(items[0], BACKWARD)
+        return page
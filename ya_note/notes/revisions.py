@@ -0,0 +1,96 @@
+"""
+История правок заметки в виде обратных дельт.
+
+Текущий текст лежит в самой заметке. При правке предыдущая версия
+сохраняется дельтой «новый текст → старый» по строкам; каждая
+SNAPSHOT_INTERVAL-я версия и версии, дельта которых не меньше текста,
+сохраняются целиком. Поэтому восстановление любой версии читает
+и применяет не больше SNAPSHOT_INTERVAL записей.
+"""
+import json
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+SNAPSHOT_INTERVAL = 50
+
+
+def make_delta(source, target):
+    """
+    Дельта, превращающая source в target.
+
+    Список из отрезков [начало, конец) строк source, которые копируются,
+    и строк, которых в source нет.
+    """
+    source_lines = source.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, source_lines, target_lines, autojunk=False)
+    delta = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        else:
+            delta.extend(target_lines[j1:j2])
+    return json.dumps(delta, ensure_ascii=False, separators=(',', ':'))
+
+
+def apply_delta(source, delta):
+    source_lines = source.splitlines(keepends=True)
+    return ''.join(
+        ''.join(source_lines[part[0]:part[1]])
+        if isinstance(part, list) else part
+        for part in json.loads(delta)
+    )
+
+
+def record_revision(note, number, title, text):
+    """Сохраняет версию number заметки, которую только что перезаписали."""
+    data = text
+    is_snapshot = number % SNAPSHOT_INTERVAL == 0
+    if not is_snapshot:
+        data = make_delta(note.text, text)
+        if len(data) >= len(text):
+            data, is_snapshot = text, True
+    return note.revisions.create(
+        number=number, title=title, is_snapshot=is_snapshot, data=data
+    )
+
+
+@dataclass
+class RevisionText:
+    number: int
+    title: str
+    text: str
+
+
+def reconstruct(note, number):
+    """
+    Заголовок и текст версии number.
+
+    Читает версии от number до ближайшего полного снимка, которым может
+    быть и сама заметка, и применяет их дельты в обратном порядке.
+    """
+    if number == note.version:
+        return RevisionText(number, note.title, note.text)
+    upper = (number // SNAPSHOT_INTERVAL + 1) * SNAPSHOT_INTERVAL
+    chain = []
+    rows = note.revisions.filter(
+        number__gte=number, number__lte=upper
+    ).order_by('number').values_list('number', 'title', 'is_snapshot', 'data')
+    for row in rows:
+        if row[0] != number + len(chain):
+            break
+        chain.append(row)
+        if row[2]:
+            break
+    if not chain or not (chain[-1][2] or chain[-1][0] == note.version - 1):
+        raise note.revisions.model.DoesNotExist(
+            f'Версии {number} заметки {note.pk} нет в истории.'
+        )
+    title = chain[0][1]
+    if chain[-1][2]:
+        text = chain.pop()[3]
+    else:
+        text = note.text
+    for *_, delta in reversed(chain):
+        text = apply_delta(text, delta)
+    return RevisionText(number, title, text)
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import Note, NoteTombstone, SyncCounter
+
+
+@receiver(pre_delete, sender=Note)
+def write_tombstone(sender, instance, **kwargs):
+    """
+    Удаление заметки остаётся в журнале изменений автора.
+
+    Сигнал срабатывает и для QuerySet.delete(), и при каскадном
+    удалении, и при удалении через админку.
+    """
+    NoteTombstone.objects.create(
+        author_id=instance.author_id,
+        note_id=instance.pk,
+        slug=instance.slug,
+        sync_version=SyncCounter.allocate(instance.author_id)[0],
+    )
+
+
+@receiver(post_delete, sender=get_user_model())
+def forget_sync_log(sender, instance, **kwargs):
+    """
+    Журнал удалённого пользователя больше никому не нужен.
+
+    Его заметки удаляются каскадом раньше самого пользователя и успевают
+    записать удаления и создать счётчик, которых нет среди удаляемых
+    объектов; без этого внешние ключи на пользователя нарушатся.
+    """
+    NoteTombstone.objects.filter(author_id=instance.pk).delete()
+    SyncCounter.objects.filter(user_id=instance.pk).delete()
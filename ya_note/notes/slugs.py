@@ -0,0 +1,92 @@
+"""
+Выбор свободного slug для заметки.
+
+Занятые slug с нужным префиксом выбираются одним запросом, свободный
+суффикс -N подбирается в памяти. Уникальный индекс по slug остаётся
+последней защитой от гонки: Note.save при IntegrityError повторяет
+выбор.
+"""
+from functools import lru_cache
+
+from django.db.models import Q
+from pytils.translit import slugify
+
+# Slug для заголовков, в которых не нашлось ни одного подходящего символа.
+FALLBACK_SLUG = 'note'
+# Сколько символов в конце slug может занять суффикс -N.
+SUFFIX_RESERVE = 8
+
+# При импорте заголовки часто повторяются, транслитерация не дешёвая.
+cached_slugify = lru_cache(maxsize=10_000)(slugify)
+
+
+def base_slug(title, max_length):
+    return cached_slugify(title)[:max_length] or FALLBACK_SLUG
+
+
+def with_suffix(base, number, max_length):
+    """base, base-2, base-3… с обрезкой base под max_length."""
+    if number == 1:
+        return base
+    suffix = f'-{number}'
+    return base[:max_length - len(suffix)] + suffix
+
+
+def prefix_range(prefix):
+    """
+    Условие «slug начинается с prefix» диапазоном.
+
+    startswith в SQLite — это LIKE … ESCAPE, который не использует
+    индекс и читает все заметки; диапазон — поиск по уникальному
+    индексу slug. slug состоит из ASCII, поэтому верхняя граница —
+    prefix с увеличенным последним символом.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(slug__gte=prefix, slug__lt=upper)
+
+
+def taken_slugs(queryset, bases, max_length):
+    """Одним запросом — все slug, с которыми могут совпасть кандидаты."""
+    condition = Q()
+    for prefix in {base[:max_length - SUFFIX_RESERVE] for base in bases}:
+        condition |= prefix_range(prefix)
+    return set(queryset.filter(condition).values_list('slug', flat=True))
+
+
+def next_free(base, taken, max_length):
+    number = 1
+    slug = base
+    while slug in taken:
+        number += 1
+        slug = with_suffix(base, number, max_length)
+    return slug
+
+
+def allocate_slug(model, title, exclude_pk=None):
+    """Свободный slug для заголовка; заметка exclude_pk не мешает себе."""
+    max_length = model._meta.get_field('slug').max_length
+    base = base_slug(title, max_length)
+    queryset = model.objects.exclude(pk=exclude_pk)
+    return next_free(base, taken_slugs(queryset, [base], max_length),
+                     max_length)
+
+
+def assign_slugs(objects):
+    """
+    Заполняет пустые slug у несохранённых объектов перед bulk_create.
+
+    Один запрос на всю пачку; slug, выбранные внутри пачки, тоже
+    считаются занятыми.
+    """
+    pending = [obj for obj in objects if not obj.slug]
+    if not pending:
+        return objects
+    model = type(pending[0])
+    max_length = model._meta.get_field('slug').max_length
+    bases = [base_slug(obj.title, max_length) for obj in pending]
+    taken = taken_slugs(model.objects.all(), bases, max_length)
+    taken.update(obj.slug for obj in objects if obj.slug)
+    for obj, base in zip(pending, bases):
+        obj.slug = next_free(base, taken, max_length)
+        taken.add(obj.slug)
+    return objects
@@ -0,0 +1,94 @@
+"""
+Журнал изменений заметок для синхронизации клиентов.
+
+Каждая запись и каждое удаление заметки получают следующий номер
+из SyncCounter автора. Клиент хранит курсор — ключ (sync_version, id)
+последнего полученного изменения — и запрашивает только то, что
+новее. Заметки, созданные в обход save (например, фабриками в тестах),
+имеют номер 0 и приходят при первой синхронизации.
+"""
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import List
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+
+from .models import Note, NoteTombstone
+from .pagination import dump_cursor, load_cursor
+
+SYNC_NOTE_FIELDS = ('id', 'slug', 'title', 'text', 'version', 'sync_version')
+SYNC_TOMBSTONE_FIELDS = ('id', 'note_id', 'slug', 'sync_version')
+
+
+def after(version, pk):
+    """
+    Условие (sync_version, id) > (version, pk) для индекса
+    (author, sync_version, id): нестрогое условие по номеру задаёт
+    диапазон индекса.
+    """
+    return Q(sync_version__gte=version) & (
+        Q(sync_version__gt=version) | Q(id__gt=pk)
+    )
+
+
+def decode(cursor):
+    if not cursor:
+        return 0, 0
+    try:
+        version, pk = map(int, load_cursor(cursor))
+    except (TypeError, ValueError):
+        raise BadRequest('Некорректный курсор.')
+    return version, pk
+
+
+def tombstone_change(row):
+    return {
+        'id': row['note_id'],
+        'slug': row['slug'],
+        'sync_version': row['sync_version'],
+        'deleted': True,
+    }
+
+
+@dataclass
+class SyncPage:
+    changes: List[dict] = field(default_factory=list)
+    cursor: str = ''
+    more: bool = False
+
+
+def changes_since(author, cursor=None, limit=None):
+    """
+    Изменения заметок автора после курсора, не больше limit.
+
+    Заметки и удаления читаются по индексам двумя запросами и сливаются
+    по ключу. Курсор в ответе есть всегда: его клиент передаёт
+    в следующий раз, даже если изменений пока нет. Номера изменений
+    больше нуля уникальны, поэтому ключи заметок и удалений не
+    совпадают.
+    """
+    limit = limit or settings.NOTES_COUNT_ON_SYNC_PAGE
+    version, pk = decode(cursor)
+    order = ('sync_version', 'id')
+    notes = Note.objects.filter(author=author).filter(
+        after(version, pk)
+    ).order_by(*order).values(*SYNC_NOTE_FIELDS)[:limit + 1]
+    tombstones = NoteTombstone.objects.filter(author=author).filter(
+        after(version, pk)
+    ).order_by(*order).values(*SYNC_TOMBSTONE_FIELDS)[:limit + 1]
+    rows = sorted(
+        [((row['sync_version'], row['id']), row) for row in notes]
+        + [((row['sync_version'], row['id']), tombstone_change(row))
+           for row in tombstones],
+        key=itemgetter(0),
+    )
+    page = rows[:limit]
+    if page:
+        cursor = dump_cursor(list(page[-1][0]))
+    return SyncPage(
+        changes=[change for _, change in page],
+        cursor=cursor or dump_cursor([0, 0]),
+        more=len(rows) > limit,
+    )
@@ -0,0 +1,92 @@
+"""
+Фабрики тестовых данных и клонируемый снимок базы.
+
+Графы объектов создаются через bulk_create: число запросов не зависит
+от числа объектов. Большой набор данных создаётся один раз за процесс,
+копируется через backup API SQLite и восстанавливается перед каждым
+тестом SeededTestCase.
+"""
+import sqlite3
+from functools import lru_cache
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Max
+from django.test import TransactionTestCase
+
+from notes.models import Note
+
+# Объём данных в снимке базы для SeededTestCase.
+SNAPSHOT_USERS = 10
+SNAPSHOT_NOTES_PER_USER = 200
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def make_users(count, prefix='Пользователь'):
+    """Пользователи без пароля: вход в тестах — через force_login."""
+    user_model = get_user_model()
+    start = next_pk(user_model)
+    users = [
+        user_model(pk=start + index, username=f'{prefix} {start + index}')
+        for index in range(count)
+    ]
+    for user in users:
+        user.set_unusable_password()
+    return user_model.objects.bulk_create(users)
+
+
+def make_notes(author, count):
+    """Заметки автора со slug вида note-<pk>."""
+    start = next_pk(Note)
+    return Note.objects.bulk_create(
+        Note(
+            pk=start + index,
+            title=f'Заметка {index}',
+            text='Текст заметки',
+            slug=f'note-{start + index}',
+            author=author,
+        )
+        for index in range(count)
+    )
+
+
+def copy_database(source):
+    """Копия базы SQLite в памяти через backup API."""
+    target = sqlite3.connect(':memory:', check_same_thread=False)
+    source.backup(target)
+    return target
+
+
+@lru_cache(maxsize=None)
+def db_snapshot():
+    """
+    Снимок мигрированной базы с большим набором данных.
+
+    Создаётся при первом обращении; сама тестовая база после этого
+    снова пуста.
+    """
+    connection.ensure_connection()
+    empty = copy_database(connection.connection)
+    for user in make_users(SNAPSHOT_USERS):
+        make_notes(user, SNAPSHOT_NOTES_PER_USER)
+    snapshot = copy_database(connection.connection)
+    empty.backup(connection.connection)
+    empty.close()
+    return snapshot
+
+
+class SeededTestCase(TransactionTestCase):
+    """
+    Каждый тест работает с клоном db_snapshot().
+
+    Копирование страниц не зависит от числа строк так, как вставка;
+    после теста TransactionTestCase очищает таблицы.
+    """
+
+    def _fixture_setup(self):
+        super()._fixture_setup()
+        connection.ensure_connection()
+        db_snapshot().backup(connection.connection)
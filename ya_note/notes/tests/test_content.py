@@ -1,25 +1,22 @@
-from django.contrib.auth import get_user_model
-from django.test import TestCase
+from http import HTTPStatus
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from notes.forms import NoteForm
-from notes.models import Note
-
-User = get_user_model()
+from notes.models import Note, NoteTombstone, SyncCounter
+from notes.pagination import dump_cursor
+from notes.tests.factories import make_notes, make_users
 
 
 class TestDetailPage(TestCase):
 
     @classmethod
     def setUpTestData(cls):
-        cls.author = User.objects.create(username='Автор')
-        cls.other_user = User.objects.create(username='Другой пользователь')
-        cls.notes = Note.objects.create(
-            title='Заголовок заметки',
-            text='Текст заметки',
-            slug='1',
-            author=cls.author
-        )
+        cls.author, cls.other_user = make_users(2)
+        [cls.notes] = make_notes(cls.author, 1)
 
     def test_notes_list(self):
         notes_list = (
@@ -39,7 +36,7 @@ class TestDetailPage(TestCase):
     def test_form_submission_add_edit(self):
         urls = (
             ('notes:add', None),
-            ('notes:edit', (self.notes.slug)),
+            ('notes:edit', (self.notes.slug,)),
         )
         for name, args in urls:
             with self.subTest(name=name):
@@ -51,3 +48,232 @@ class TestDetailPage(TestCase):
                     self.client.get(url).context['form'],
                     NoteForm
                 )
+
+
+class TestConditionalGet(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        [cls.author] = make_users(1)
+        [cls.note] = make_notes(cls.author, 1)
+        cls.url = reverse('notes:detail', args=(cls.note.slug,))
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_unchanged_note_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_edit_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.note.text = 'Новый текст заметки'
+        self.note.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+@override_settings(NOTES_COUNT_ON_PAGE=3)
+class TestNotesListPages(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, reader = make_users(2)
+        cls.notes = make_notes(cls.author, 7)
+        make_notes(reader, 2)
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def walk(self, url, next_cursor):
+        """Идентификаторы заметок со всех страниц по курсору next."""
+        seen = []
+        cursor = None
+        while True:
+            response = self.client.get(url, {'cursor': cursor or ''})
+            page_ids, cursor = next_cursor(response)
+            seen.extend(page_ids)
+            if not cursor:
+                return seen
+
+    def test_html_pages(self):
+        def next_cursor(response):
+            page = response.context['page_obj']
+            return [note.id for note in page], page.next_cursor
+
+        with CaptureQueriesContext(connection) as context:
+            seen = self.walk(reverse('notes:list'), next_cursor)
+        self.assertEqual(seen, [note.pk for note in self.notes])
+        self.assertFalse(any(
+            '"notes_note"."text"' in query['sql']
+            for query in context.captured_queries
+        ))
+
+    def test_page_query_uses_index(self):
+        url = reverse('notes:list')
+        cursor = self.client.get(url).context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, {'cursor': cursor})
+        sql = next(
+            query['sql'] for query in context.captured_queries
+            if 'FROM "notes_note"' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('note_author_id_idx (author_id=? AND id>?)', plan)
+
+    def test_null_cursor(self):
+        cursor = dump_cursor(['a', [None]])
+        for url in (reverse('notes:list'), reverse('notes:api_list')):
+            with self.subTest(url=url):
+                response = self.client.get(url, {'cursor': cursor})
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+
+    def test_api_pages(self):
+        def next_cursor(response):
+            data = response.json()
+            return [row['slug'] for row in data['results']], data['next']
+
+        seen = self.walk(reverse('notes:api_list'), next_cursor)
+        self.assertEqual(seen, [note.slug for note in self.notes])
+
+
+class TestJsonApi(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.reader = make_users(2)
+        [cls.note] = make_notes(cls.author, 1)
+        make_notes(cls.reader, 1)
+        cls.list_url = reverse('notes:api_list')
+        cls.detail_url = reverse('notes:api_detail', args=(cls.note.slug,))
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_list_has_only_own_notes_without_text(self):
+        data = self.client.get(self.list_url).json()
+        self.assertEqual(data['results'], [{
+            'slug': self.note.slug,
+            'title': self.note.title,
+            'version': self.note.version,
+        }])
+
+    def test_fields_selection(self):
+        data = self.client.get(self.detail_url, {'fields': 'text'}).json()
+        self.assertEqual(data, {'text': self.note.text})
+        response = self.client.get(self.list_url, {'fields': 'author'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_unchanged_note_is_not_modified(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        response = self.client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_anonymous_and_other_users(self):
+        self.client.force_login(self.reader)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.client.logout()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+
+@override_settings(NOTES_COUNT_ON_SYNC_PAGE=3)
+class TestNotesSync(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.reader = make_users(2)
+        cls.notes = make_notes(cls.author, 4) + [
+            Note.objects.create(
+                title=f'Заметка {index}', text='Текст', author=cls.author
+            )
+            for index in range(3)
+        ]
+        make_notes(cls.reader, 2)
+        cls.url = reverse('notes:api_sync')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def sync(self, cursor=''):
+        """Все изменения после cursor и курсор для следующего раза."""
+        changes = []
+        while True:
+            data = self.client.get(self.url, {'cursor': cursor}).json()
+            self.assertLessEqual(len(data['changes']), 3)
+            changes.extend(data['changes'])
+            cursor = data['cursor']
+            if not data['more']:
+                return changes, cursor
+
+    def test_full_then_incremental_sync(self):
+        changes, cursor = self.sync()
+        self.assertEqual(
+            [change['id'] for change in changes],
+            [note.pk for note in self.notes],
+        )
+        self.assertEqual(self.sync(cursor), ([], cursor))
+        edited, deleted = self.notes[0], self.notes[-1]
+        deleted_pk = deleted.pk
+        edited.text = 'Правка'
+        edited.save()
+        deleted.delete()
+        Note.objects.create(title='Чужая', text='Текст', author=self.reader)
+        changes, _ = self.sync(cursor)
+        self.assertEqual(
+            [(change['id'], change.get('deleted', False))
+             for change in changes],
+            [(edited.pk, False), (deleted_pk, True)],
+        )
+        self.assertEqual(changes[0]['text'], 'Правка')
+
+    def test_since_queries_use_indexes(self):
+        _, cursor = self.sync()
+        self.notes[0].delete()
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url, {'cursor': cursor})
+        plans = []
+        for query in context.captured_queries:
+            if 'sync_version' not in query['sql']:
+                continue
+            with connection.cursor() as db_cursor:
+                db_cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plans.append(' '.join(
+                    str(row) for row in db_cursor.fetchall()
+                ))
+        self.assertEqual(len(plans), 2)
+        self.assertIn(
+            'note_author_sync_idx (author_id=? AND sync_version>?)', plans[0]
+        )
+        self.assertIn(
+            'tombstone_author_sync_idx (author_id=? AND sync_version>?)',
+            plans[1],
+        )
+        self.assertNotIn('TEMP B-TREE', ' '.join(plans))
+
+    def test_bulk_and_cascade_deletes_are_synced(self):
+        _, cursor = self.sync()
+        deleted = [note.pk for note in self.notes[:3]]
+        Note.objects.filter(pk__in=deleted).delete()
+        changes, _ = self.sync(cursor)
+        self.assertEqual(
+            [(change['id'], change.get('deleted')) for change in changes],
+            [(pk, True) for pk in deleted],
+        )
+        self.author.delete()
+        self.assertFalse(NoteTombstone.objects.exists())
+        self.assertFalse(SyncCounter.objects.exists())
+
+    def test_bad_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'сломан'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
@@ -1,12 +1,26 @@
+import json
+import zipfile
 from http import HTTPStatus
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from pytils.translit import slugify
 
-from notes.forms import WARNING
-from notes.models import Note
+from notes.archive import import_file, import_notes, read_jsonl
+from notes.forms import CONFLICT, WARNING
+from notes.fields import RAW, ZLIB, compress, decompress
+from notes.models import Note, NoteRevision, VersionConflict
+from notes.revisions import SNAPSHOT_INTERVAL, reconstruct
+from notes.slugs import allocate_slug, assign_slugs
+from notes.tests.factories import make_users
 
 User = get_user_model()
 
@@ -15,7 +29,7 @@ class TestNoteCreation(TestCase):
 
     @classmethod
     def setUpTestData(cls):
-        cls.author = User.objects.create(username='Автор')
+        [cls.author] = make_users(1)
         cls.form_data = {'title': 'Заголовок заметки',
                          'text': 'Текст заметки',
                          'slug': 'abcd'}
@@ -64,6 +78,441 @@ class TestNoteCreation(TestCase):
         self.assertEqual(note.slug, expected_slug)
 
 
+class TestSlugAllocation(TestCase):
+    TITLE = 'Заголовок заметки'
+
+    @classmethod
+    def setUpTestData(cls):
+        [cls.author] = make_users(1)
+
+    def make_note(self, title=TITLE, **kwargs):
+        return Note.objects.create(
+            title=title, text='Текст', author=self.author, **kwargs
+        )
+
+    def test_same_titles_get_suffixes(self):
+        self.client.force_login(self.author)
+        for _ in range(3):
+            self.client.post(
+                reverse('notes:add'), {'title': self.TITLE, 'text': 'Текст'}
+            )
+        base = slugify(self.TITLE)
+        self.assertEqual(
+            sorted(Note.objects.values_list('slug', flat=True)),
+            [base, f'{base}-2', f'{base}-3'],
+        )
+
+    def test_suffix_respects_max_length(self):
+        title = 'a' * 120
+        self.make_note(title)
+        note = self.make_note(title)
+        self.assertEqual(note.slug, 'a' * 98 + '-2')
+
+    def test_single_query_for_many_taken_slugs(self):
+        base = slugify(self.TITLE)
+        self.make_note(slug=base)
+        Note.objects.bulk_create(
+            Note(title=self.TITLE, text='Текст', slug=f'{base}-{number}',
+                 author=self.author)
+            for number in range(2, 30)
+        )
+        with self.assertNumQueries(1):
+            slug = allocate_slug(Note, self.TITLE)
+        self.assertEqual(slug, f'{base}-30')
+
+    def test_taken_slugs_query_uses_index(self):
+        self.make_note()
+        self.make_note(title='Другая заметка')
+        with CaptureQueriesContext(connection) as context:
+            allocate_slug(Note, self.TITLE)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'EXPLAIN QUERY PLAN {context.captured_queries[0]["sql"]}'
+            )
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('(slug>? AND slug<?)', plan)
+        self.assertNotIn('SCAN', plan)
+
+    def test_bulk_assignment(self):
+        self.make_note()
+        notes = [
+            Note(title=self.TITLE, text='Текст', author=self.author)
+            for _ in range(2)
+        ]
+        with self.assertNumQueries(1):
+            assign_slugs(notes)
+        base = slugify(self.TITLE)
+        self.assertEqual(
+            [note.slug for note in notes], [f'{base}-2', f'{base}-3']
+        )
+
+    def test_retry_after_race(self):
+        taken = self.make_note().slug
+        with patch(
+            'notes.models.allocate_slug',
+            side_effect=[taken, allocate_slug(Note, self.TITLE)],
+        ):
+            note = self.make_note()
+        self.assertEqual(note.slug, f'{taken}-2')
+
+
+class TestNotesArchive(TestCase):
+    TITLE = 'Заголовок заметки'
+
+    @classmethod
+    def setUpTestData(cls):
+        [cls.author] = make_users(1)
+        cls.IMPORT_URL = reverse('notes:import')
+        cls.EXPORT_URL = reverse('notes:export')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def make_zip(self, files):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name, content in files.items():
+                archive.writestr(name, content)
+        return SimpleUploadedFile('notes.zip', buffer.getvalue())
+
+    def test_zip_import(self):
+        upload = self.make_zip({
+            'one.md': f'# {self.TITLE}\n\nПервый текст',
+            'two.md': f'# {self.TITLE}\n\nВторой текст',
+            'Без заголовка.md': 'Третий текст',
+            'readme.txt': 'Не заметка',
+        })
+        response = self.client.post(self.IMPORT_URL, {'file': upload})
+        self.assertRedirects(response, reverse('notes:success'))
+        base = slugify(self.TITLE)
+        self.assertEqual(
+            list(Note.objects.order_by('id').values_list(
+                'title', 'text', 'slug'
+            )),
+            [
+                (self.TITLE, 'Первый текст', base),
+                (self.TITLE, 'Второй текст', f'{base}-2'),
+                ('Без заголовка', 'Третий текст', slugify('Без заголовка')),
+            ],
+        )
+
+    def test_jsonl_import(self):
+        lines = [
+            json.dumps({'title': self.TITLE, 'text': 'Текст'}),
+            '',
+            json.dumps({'text': 'Без заголовка'}),
+        ]
+        upload = SimpleUploadedFile(
+            'notes.jsonl', '\n'.join(lines).encode('utf-8')
+        )
+        self.client.post(self.IMPORT_URL, {'file': upload})
+        self.assertEqual(Note.objects.filter(author=self.author).count(), 2)
+
+    def test_invalid_upload(self):
+        for name, content in (
+            ('notes.txt', b'text'),
+            ('notes.zip', b'not a zip'),
+            ('notes.jsonl', b'{broken'),
+        ):
+            with self.subTest(name=name):
+                response = self.client.post(
+                    self.IMPORT_URL,
+                    {'file': SimpleUploadedFile(name, content)},
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertTrue(response.context['form'].errors)
+        self.assertEqual(Note.objects.count(), 0)
+
+    def test_invalid_source_imports_nothing(self):
+        lines = [json.dumps({'title': self.TITLE, 'text': 'Текст'})] * 3
+        source = BytesIO('\n'.join([*lines, '{broken']).encode('utf-8'))
+        with self.assertRaisesMessage(ValidationError, 'Строка 4'):
+            import_file(self.author, read_jsonl, source, batch_size=1)
+        self.assertEqual(Note.objects.count(), 0)
+
+    def test_corrupt_zip_member(self):
+        content = f'# {self.TITLE}\n\n' + 'Текст заметки. ' * 100
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('good.md', content)
+            archive.writestr('bad.md', content)
+        data = bytearray(buffer.getvalue())
+        # Портим сжатые данные второго файла, не трогая заголовки.
+        with zipfile.ZipFile(BytesIO(bytes(data))) as archive:
+            info = archive.getinfo('bad.md')
+        start = info.header_offset + 30 + len(info.filename)
+        for offset in range(start, start + info.compress_size):
+            data[offset] ^= 0xFF
+        response = self.client.post(self.IMPORT_URL, {
+            'file': SimpleUploadedFile('notes.zip', bytes(data))
+        })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('bad.md', response.context['form'].errors['file'][0])
+        self.assertEqual(Note.objects.count(), 0)
+
+    def test_queries_per_batch(self):
+        rows = [{'title': self.TITLE, 'text': 'Текст'}] * 25
+        # На пачку: подбор slug, savepoint, два запроса к счётчику
+        # изменений, вставка, release savepoint. Для первой пачки счётчик
+        # ещё создаётся в своём savepoint.
+        with self.assertNumQueries(3 * 6 + 3):
+            imported = import_notes(self.author, rows, batch_size=10)
+        self.assertEqual(imported, 25)
+        self.assertEqual(
+            Note.objects.values('slug').distinct().count(), 25
+        )
+
+    def test_export_round_trip(self):
+        import_notes(self.author, [
+            {'title': f'{self.TITLE} {index}', 'text': f'Текст {index}'}
+            for index in range(3)
+        ])
+        response = self.client.get(self.EXPORT_URL)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        content = b''.join(response.streaming_content)
+        Note.objects.all().delete()
+        self.client.post(self.IMPORT_URL, {
+            'file': SimpleUploadedFile('notes.zip', content)
+        })
+        self.assertEqual(
+            list(Note.objects.order_by('id').values_list('title', 'text')),
+            [(f'{self.TITLE} {index}', f'Текст {index}')
+             for index in range(3)],
+        )
+
+    def test_jsonl_export_only_own_notes(self):
+        import_notes(self.author, [{'title': self.TITLE, 'text': 'Текст'}])
+        reader = User.objects.create(username='Читатель')
+        import_notes(reader, [{'title': 'Чужая', 'text': 'Текст'}])
+        response = self.client.get(self.EXPORT_URL, {'format': 'jsonl'})
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([row['title'] for row in rows], [self.TITLE])
+        response = self.client.get(self.EXPORT_URL, {'format': 'xml'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
+class TestCompressedText(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        [cls.author] = make_users(1)
+
+    def stored_text(self, note):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT text FROM notes_note WHERE id = %s', [note.pk]
+            )
+            return bytes(cursor.fetchone()[0])
+
+    def test_format_header(self):
+        self.assertEqual(compress('Коротко'), RAW + 'Коротко'.encode())
+        text = 'Повторяющийся текст заметки. ' * 100
+        packed = compress(text)
+        self.assertTrue(packed.startswith(ZLIB))
+        self.assertLess(len(packed), len(text) // 10)
+        self.assertEqual(decompress(packed), text)
+        legacy = 'Записано до сжатия'
+        self.assertEqual(decompress(legacy), legacy)
+        with self.assertRaises(ValueError):
+            decompress(b'\x7fdata')
+
+    def test_form_edit_round_trip(self):
+        text = ' '.join(['Длинная заметка с подробностями.'] * 200)
+        self.client.force_login(self.author)
+        self.client.post(
+            reverse('notes:add'),
+            {'title': 'Заметка', 'text': text, 'slug': 'note'},
+        )
+        note = Note.objects.get(slug='note')
+        self.assertEqual(note.text, text)
+        self.assertTrue(self.stored_text(note).startswith(ZLIB))
+        response = self.client.get(reverse('notes:edit', args=['note']))
+        self.assertEqual(response.context['form'].initial['text'], text)
+
+
+class TestNoteRevisions(TestCase):
+    EDITS = SNAPSHOT_INTERVAL * 2 + 10
+
+    @classmethod
+    def setUpTestData(cls):
+        [cls.author] = make_users(1)
+        lines = [f'Строка {index}\n' for index in range(200)]
+        cls.note = Note.objects.create(
+            title='Заметка', text=''.join(lines), author=cls.author
+        )
+        cls.history = [(cls.note.title, cls.note.text)]
+        for edit in range(cls.EDITS):
+            lines[edit % len(lines)] = f'Правка {edit}\n'
+            cls.note.text = ''.join(lines)
+            if edit % 7 == 0:
+                cls.note.title = f'Заметка {edit}'
+            cls.note.save()
+            cls.history.append((cls.note.title, cls.note.text))
+
+    def test_every_revision_is_restored(self):
+        note = Note.objects.get(pk=self.note.pk)
+        self.assertEqual(note.version, self.EDITS + 1)
+        for number, (title, text) in enumerate(self.history, start=1):
+            with self.subTest(number=number), self.assertNumQueries(
+                0 if number == note.version else 1
+            ):
+                revision = reconstruct(note, number)
+            self.assertEqual((revision.title, revision.text), (title, text))
+
+    def test_revisions_are_deltas(self):
+        revisions = NoteRevision.objects.filter(note=self.note)
+        self.assertEqual(revisions.count(), self.EDITS)
+        self.assertEqual(
+            list(revisions.filter(is_snapshot=True).values_list(
+                'number', flat=True
+            )),
+            [SNAPSHOT_INTERVAL, SNAPSHOT_INTERVAL * 2],
+        )
+        for data in revisions.filter(is_snapshot=False).values_list(
+            'data', flat=True
+        ):
+            self.assertLess(len(data), len(self.note.text) // 20)
+
+    def test_unchanged_save_adds_no_revision(self):
+        note = Note.objects.get(pk=self.note.pk)
+        note.save()
+        self.assertEqual(note.revisions.count(), self.EDITS)
+
+    def test_slug_only_save_keeps_history_contiguous(self):
+        note = Note.objects.create(
+            title='Заметка', text='Первый текст', author=self.author
+        )
+        note.text = 'Второй текст'
+        note.save()
+        note.slug = 'new-slug'
+        note.save()
+        self.assertEqual(note.version, 2)
+        note.text = 'Третий текст'
+        note.save()
+        self.assertEqual(
+            [reconstruct(note, number).text for number in (1, 2, 3)],
+            ['Первый текст', 'Второй текст', 'Третий текст'],
+        )
+
+    def test_update_fields_save_stores_version(self):
+        note = Note.objects.create(
+            title='Заметка', text='Первый текст', author=self.author
+        )
+        for text in ('Второй текст', 'Третий текст'):
+            note.text = text
+            note.save(update_fields=['text'])
+        note = Note.objects.get(pk=note.pk)
+        self.assertEqual(note.version, 3)
+        self.assertEqual(
+            [reconstruct(note, number).text for number in (1, 2, 3)],
+            ['Первый текст', 'Второй текст', 'Третий текст'],
+        )
+        note.slug = 'new-slug'
+        note.save(update_fields=['slug'])
+        self.assertEqual(Note.objects.get(pk=note.pk).version, 3)
+
+    def test_compaction_keeps_recent_revisions(self):
+        keep = SNAPSHOT_INTERVAL // 2
+        call_command('compact_revisions', keep=keep, stdout=StringIO())
+        note = Note.objects.get(pk=self.note.pk)
+        self.assertEqual(note.revisions.count(), keep)
+        oldest = note.version - keep
+        self.assertEqual(
+            reconstruct(note, oldest).text, self.history[oldest - 1][1]
+        )
+        with self.assertRaises(NoteRevision.DoesNotExist):
+            reconstruct(note, oldest - 1)
+
+
+class TestNotePatch(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        [cls.author] = make_users(1)
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', slug='note', author=cls.author
+        )
+        Note.objects.create(
+            title='Другая', text='Текст', slug='other', author=cls.author
+        )
+        cls.url = reverse('notes:api_detail', args=('note',))
+
+    def setUp(self):
+        self.client.force_login(self.author)
+        self.etag = self.client.get(self.url)['ETag']
+
+    def patch(self, data, etag=None):
+        return self.client.patch(
+            self.url, json.dumps(data), content_type='application/json',
+            HTTP_IF_MATCH=etag or self.etag,
+        )
+
+    def test_only_changed_fields_are_written(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.patch({'text': 'Новый текст', 'slug': 'note'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['version'], 2)
+        self.assertNotEqual(response['ETag'], self.etag)
+        sql = [query['sql'] for query in context.captured_queries]
+        update = next(
+            query for query in sql if query.startswith('UPDATE "notes_note"')
+        )
+        self.assertIn('SET "text" = ', update)
+        self.assertNotIn('"slug"', update)
+        self.assertNotIn('"title"', update)
+        self.assertFalse([query for query in sql if 'SELECT (1)' in query])
+        note = Note.objects.get(pk=self.note.pk)
+        self.assertEqual((note.text, note.version), ('Новый текст', 2))
+
+    def test_stale_or_missing_version(self):
+        self.patch({'title': 'Первая правка'})
+        response = self.patch({'title': 'Вторая правка'})
+        self.assertEqual(response.status_code, HTTPStatus.PRECONDITION_FAILED)
+        response = self.client.patch(
+            self.url, '{}', content_type='application/json'
+        )
+        self.assertEqual(
+            response.status_code, HTTPStatus.PRECONDITION_REQUIRED
+        )
+        self.assertEqual(
+            Note.objects.get(pk=self.note.pk).title, 'Первая правка'
+        )
+
+    def test_conflicting_write_is_rejected(self):
+        note = Note.objects.get(pk=self.note.pk)
+        Note.objects.filter(pk=note.pk).update(version=5)
+        note.text = 'Устаревшая правка'
+        with self.assertRaises(VersionConflict):
+            note.save(update_fields=('text', 'version'), expected_version=1)
+        self.assertEqual(note.version, 1)
+        self.assertEqual(Note.objects.get(pk=note.pk).text, 'Текст')
+        self.assertEqual(note.revisions.count(), 0)
+
+    def test_invalid_changes(self):
+        response = self.patch({'slug': 'other'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('slug', response.json()['errors'])
+        response = self.patch({'author': 1})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(Note.objects.get(pk=self.note.pk).version, 1)
+
+    def test_edit_form_skips_unchanged_slug_check(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.post(
+                reverse('notes:edit', args=('note',)),
+                {'title': 'Заголовок', 'text': 'Правка', 'slug': 'note'},
+            )
+        self.assertFalse([
+            query for query in context.captured_queries
+            if 'SELECT (1)' in query['sql']
+        ])
+        self.assertEqual(Note.objects.get(pk=self.note.pk).text, 'Правка')
+
+
 class TestNoteEditDelete(TestCase):
     TITLE = 'Заголовок заметки'
     TEXT = 'Текст заметки'
@@ -72,10 +521,10 @@ class TestNoteEditDelete(TestCase):
 
     @classmethod
     def setUpTestData(cls):
-        cls.author = User.objects.create(username='Автор')
+        [cls.author] = make_users(1)
         cls.author_client = Client()
         cls.author_client.force_login(cls.author)
-        cls.other_user = User.objects.create(username='Другой пользователь')
+        [cls.other_user] = make_users(1)
         cls.other_user_client = Client()
         cls.other_user_client.force_login(cls.other_user)
         cls.notes = Note.objects.create(
@@ -108,6 +557,27 @@ class TestNoteEditDelete(TestCase):
         self.assertEqual(self.notes.slug, 'novyij-zagolovok-zametki')
         self.assertEqual(self.notes.author, self.author)
 
+    def test_edit_form_rejects_stale_version(self):
+        response = self.author_client.get(self.edit_url)
+        version = response.context['form']['version'].value()
+        self.assertEqual(version, 1)
+        self.notes.text = 'Правка из другой вкладки'
+        self.notes.save()
+        response = self.author_client.post(
+            self.edit_url, data={**self.form_data, 'version': version}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn(CONFLICT, response.context['form'].non_field_errors())
+        self.notes.refresh_from_db()
+        self.assertEqual(self.notes.text, 'Правка из другой вкладки')
+        self.assertEqual(self.notes.version, 2)
+        response = self.author_client.post(
+            self.edit_url, data={**self.form_data, 'version': 2}
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        self.notes.refresh_from_db()
+        self.assertEqual(self.notes.version, 3)
+
     def test_user_cant_edit_note_of_another_user(self):
         response = self.other_user_client.post(
             self.edit_url,
@@ -119,3 +589,16 @@ class TestNoteEditDelete(TestCase):
         self.assertEqual(self.notes.title, note_from_db.title)
         self.assertEqual(self.notes.slug, note_from_db.slug)
         self.assertEqual(self.notes.author, note_from_db.author)
+
+
+class TestSeed(TestCase):
+
+    def test_seed_creates_requested_volumes(self):
+        call_command(
+            'seed', users=3, notes=50, batch_size=7, seed=1, stdout=StringIO()
+        )
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Note.objects.count(), 50)
+        self.assertEqual(
+            Note.objects.values('slug').distinct().count(), 50
+        )
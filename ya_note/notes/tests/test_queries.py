@@ -0,0 +1,135 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from notes.tests.factories import SeededTestCase, make_notes
+from yanote.sqlite import configure_sqlite
+
+User = get_user_model()
+
+# Допустимое число SQL-запросов на GET-запрос авторизованного
+# пользователя, включая чтение сессии и пользователя.
+QUERY_BUDGETS = {
+    'notes:home': 2,
+    'notes:list': 3,
+    'notes:success': 2,
+    'notes:add': 2,
+    'notes:detail': 4,
+    'notes:edit': 3,
+    'notes:delete': 3,
+    'notes:api_list': 3,
+    'notes:api_detail': 4,
+    'notes:api_sync': 4,
+}
+
+
+class QueryBudgetMixin:
+    """Проверка, что страница укладывается в свой бюджет запросов."""
+
+    def assertQueryBudget(self, name, args=None):
+        url = reverse(name, args=args)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertLessEqual(
+            len(context),
+            QUERY_BUDGETS[name],
+            f'{name}: {len(context)} запросов вместо '
+            f'{QUERY_BUDGETS[name]}:\n'
+            + '\n'.join(query['sql'] for query in context.captured_queries)
+        )
+        return response
+
+
+class TestQueryBudgets(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.notes = make_notes(cls.author, 20)
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_query_budgets(self):
+        slug = (self.notes[0].slug,)
+        urls = (
+            ('notes:home', None),
+            ('notes:list', None),
+            ('notes:success', None),
+            ('notes:add', None),
+            ('notes:detail', slug),
+            ('notes:edit', slug),
+            ('notes:delete', slug),
+            ('notes:api_list', None),
+            ('notes:api_detail', slug),
+            ('notes:api_sync', None),
+        )
+        for name, args in urls:
+            with self.subTest(name=name):
+                response = self.assertQueryBudget(name, args)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing(self):
+        url = reverse('notes:list')
+        with self.assertLogs('yanote.timing', level='INFO') as logs:
+            response = self.client.get(url)
+        self.assertTrue(
+            response['Server-Timing'].startswith('db;desc="3 queries"')
+        )
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['view'], 'notes:list')
+        self.assertEqual(record['queries'], 3)
+
+    def test_server_timing_is_opt_in(self):
+        response = self.client.get(reverse('notes:list'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class TestSeededQueryBudgets(QueryBudgetMixin, SeededTestCase):
+    """Бюджеты запросов на базе с сотнями заметок у пользователя."""
+
+    def setUp(self):
+        self.note = Note.objects.select_related('author').first()
+        self.client.force_login(self.note.author)
+
+    def test_query_budgets(self):
+        slug = (self.note.slug,)
+        urls = (
+            ('notes:list', None),
+            ('notes:detail', slug),
+            ('notes:api_list', None),
+            ('notes:api_detail', slug),
+        )
+        for name, args in urls:
+            with self.subTest(name=name):
+                response = self.assertQueryBudget(name, args)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class TestSqlitePragmas(SimpleTestCase):
+    databases = {'default'}
+
+    def test_pragmas_are_applied(self):
+        pragmas = (
+            ('busy_timeout', 5000),
+            ('synchronous', 1),
+            ('temp_store', 2),
+        )
+        with connection.cursor() as cursor:
+            for pragma, expected in pragmas:
+                with self.subTest(pragma=pragma):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.assertEqual(cursor.fetchone()[0], expected)
+
+    @override_settings(SQLITE_PRAGMAS={'journal_mode': 'WAL; VACUUM'})
+    def test_bad_pragma_value_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            configure_sqlite(sender=None, connection=connection)
@@ -0,0 +1,52 @@
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from notes.models import Note
+from yanote.routers import (PRIMARY, REPLICA, STICKY_COOKIE,
+                            PrimaryReplicaRouter, use_primary)
+
+User = get_user_model()
+
+
+class TestReplica(TransactionTestCase):
+    """Реплика — отдельный файл SQLite, обновляемый командой sync_replica."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        connections.databases[REPLICA] = {
+            **connections.databases[PRIMARY],
+            'NAME': str(Path(directory.name) / 'replica.sqlite3'),
+        }
+        self.addCleanup(connections.databases.pop, REPLICA)
+        self.addCleanup(connections.__delitem__, REPLICA)
+        self.addCleanup(lambda: connections[REPLICA].close())
+        self.author = User.objects.create(username='Автор')
+        self.client.force_login(self.author)
+
+    def test_router(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Note), REPLICA)
+        self.assertEqual(router.db_for_read(User), PRIMARY)
+        self.assertEqual(router.db_for_write(Note), PRIMARY)
+        with use_primary():
+            self.assertEqual(router.db_for_read(Note), PRIMARY)
+
+    def test_reads_follow_writes(self):
+        call_command('sync_replica')
+        url = reverse('notes:list')
+        response = self.client.post(reverse('notes:add'), {
+            'title': 'Заголовок', 'text': 'Текст', 'slug': 'note'
+        })
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(len(self.client.get(url).context['object_list']), 1)
+        self.client.cookies.pop(STICKY_COOKIE)
+        self.assertEqual(len(self.client.get(url).context['object_list']), 0)
+        call_command('sync_replica')
+        self.assertEqual(len(self.client.get(url).context['object_list']), 1)
@@ -1,26 +1,17 @@
 from http import HTTPStatus
 
-from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 
-from notes.models import Note
-
-User = get_user_model()
+from notes.tests.factories import make_notes, make_users
 
 
 class TestRoutes(TestCase):
 
     @classmethod
     def setUpTestData(cls):
-        cls.author = User.objects.create(username='Автор')
-        cls.other_user = User.objects.create(username='Другой пользователь')
-        cls.notes = Note.objects.create(
-            title='Заголовок заметки',
-            text='Текст заметки',
-            slug='1',
-            author=cls.author
-        )
+        cls.author, cls.other_user = make_users(2)
+        [cls.notes] = make_notes(cls.author, 1)
 
     def test_pages_availability(self):
         urls = (
@@ -61,16 +52,16 @@ class TestRoutes(TestCase):
             self.client.force_login(user)
             for name in urls:
                 with self.subTest(user=user, name=name):
-                    url = reverse(name, args=(self.notes.slug))
+                    url = reverse(name, args=(self.notes.slug,))
                     response = self.client.get(url)
                     self.assertEqual(response.status_code, status)
 
     def test_redirect_for_anonymous_client(self):
         login_url = reverse('users:login')
         urls = (
-            ('notes:edit', (self.notes.slug)),
-            ('notes:delete', (self.notes.slug)),
-            ('notes:detail', (self.notes.slug)),
+            ('notes:edit', (self.notes.slug,)),
+            ('notes:delete', (self.notes.slug,)),
+            ('notes:detail', (self.notes.slug,)),
             ('notes:list', None),
             ('notes:success', None),
             ('notes:add', None),
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from notes import views
+from notes import api, views
 
 app_name = 'notes'
 
@@ -12,4 +12,13 @@ urlpatterns = [
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('import/', views.NotesImport.as_view(), name='import'),
+    path('export/', views.NotesExport.as_view(), name='export'),
+    path('api/notes/', api.NotesListApi.as_view(), name='api_list'),
+    path('api/sync/', api.NotesSyncApi.as_view(), name='api_sync'),
+    path(
+        'api/notes/<slug:slug>/',
+        api.NoteDetailApi.as_view(),
+        name='api_detail'
+    ),
 ]
@@ -1,9 +1,17 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest, ValidationError
+from django.http import HttpResponseRedirect, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
-from .forms import NoteForm
-from .models import Note
+from .archive import (export_jsonl, export_zip, import_file, read_jsonl,
+                      read_zip)
+from .forms import CONFLICT, NoteEditForm, NoteForm, NotesImportForm
+from .models import Note, VersionConflict
+from .pagination import KeysetPaginator
 
 
 class Home(generic.TemplateView):
@@ -39,9 +47,22 @@ class NoteCreate(NoteBase, generic.CreateView):
 
 
 class NoteUpdate(NoteBase, generic.UpdateView):
-    """Редактирование заметки."""
+    """
+    Редактирование заметки.
+
+    Сохраняет, только если заметку не изменили с тех пор, как открыли
+    форму, иначе показывает форму с ошибкой.
+    """
     template_name = 'notes/form.html'
-    form_class = NoteForm
+    form_class = NoteEditForm
+
+    def form_valid(self, form):
+        try:
+            form.instance.save(expected_version=form.cleaned_data['version'])
+        except VersionConflict:
+            form.add_error(None, CONFLICT)
+            return self.form_invalid(form)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -50,11 +71,86 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список заметок пользователя, постранично по ключу (author_id, id).
+
+    Автор уже зафиксирован фильтром, поэтому курсор хранит только id:
+    условие author_id = ? AND id > ? — это диапазон индекса
+    note_author_id_idx, и любая страница стоит одинаково. Шаблону нужны
+    только id, slug и title, текст не загружается.
+    """
     template_name = 'notes/list.html'
     context_object_name = 'notes_feed'
+    ordering = ('id',)
+
+    def get_queryset(self):
+        return super().get_queryset().only('id', 'slug', 'title')
+
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_COUNT_ON_PAGE
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.ordering, page_size)
+        page = paginator.get_page(self.request.GET.get('cursor'))
+        is_paginated = bool(page.next_cursor or page.prev_cursor)
+        return paginator, page, page.object_list, is_paginated
+
+
+def version_etag(pk, version):
+    """ETag заметки без кавычек; его же ждёт If-Match в API."""
+    return f'{pk}-{version}'
+
+
+def note_etag(request, slug):
+    """ETag заметки: номер её версии, без загрузки самой заметки."""
+    version = Note.objects.filter(
+        author=request.user, slug=slug
+    ).values_list('pk', 'version').first()
+    return version_etag(*version) if version else None
 
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+    @method_decorator(condition(etag_func=note_etag))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class NotesImport(LoginRequiredMixin, generic.FormView):
+    """Загрузка заметок из zip-архива Markdown-файлов или JSONL."""
+    template_name = 'notes/import.html'
+    form_class = NotesImportForm
+    success_url = reverse_lazy('notes:success')
+
+    def form_valid(self, form):
+        file = form.cleaned_data['file']
+        read = read_zip if file.name.endswith('.zip') else read_jsonl
+        try:
+            import_file(self.request.user, read, file)
+        except ValidationError as error:
+            form.add_error('file', error)
+            return self.form_invalid(form)
+        return super().form_valid(form)
+
+
+class NotesExport(NoteBase, generic.View):
+    """Выгрузка всех заметок пользователя потоком."""
+    formats = {
+        'zip': (export_zip, 'application/zip'),
+        'jsonl': (export_jsonl, 'application/x-ndjson; charset=utf-8'),
+    }
+
+    def get(self, request):
+        export_format = request.GET.get('format', 'zip')
+        if export_format not in self.formats:
+            raise BadRequest('Поддерживаются форматы zip и jsonl.')
+        export, content_type = self.formats[export_format]
+        response = StreamingHttpResponse(
+            export(self.get_queryset()), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{export_format}"'
+        )
+        return response
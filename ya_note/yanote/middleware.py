@@ -0,0 +1,87 @@
+import json
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('yanote.timing')
+
+
+class RequestMetrics:
+    """Счётчики одного запроса: число SQL-запросов и затраченное время."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper()."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += perf_counter() - started
+
+    def wrap_render(self, response):
+        """Засекает время отрисовки шаблона у TemplateResponse."""
+        render = response.render
+
+        def timed_render():
+            started = perf_counter()
+            try:
+                return render()
+            finally:
+                self.template_time += perf_counter() - started
+
+        response.render = timed_render
+
+
+class ServerTimingMiddleware:
+    """
+    Замеряет запросы к БД, время SQL, шаблонов и всего запроса.
+
+    Результат отдаётся в заголовке Server-Timing и пишется в лог одной
+    строкой JSON. Включается настройкой SERVER_TIMING. Время шаблонов
+    включает SQL, выполненный ленивыми запросами при отрисовке.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request.metrics = RequestMetrics()
+        started = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        total = perf_counter() - started
+        response['Server-Timing'] = ', '.join((
+            f'db;desc="{metrics.queries} queries";'
+            f'dur={metrics.sql_time * 1000:.2f}',
+            f'tpl;dur={metrics.template_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        request.metrics.wrap_render(response)
+        return response
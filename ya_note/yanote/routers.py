@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+STICKY_COOKIE = 'use_primary'
+
+_use_primary = ContextVar('use_primary', default=False)
+
+
+@contextmanager
+def use_primary():
+    """Внутри блока все чтения идут в основную базу."""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Отправляет чтения моделей из REPLICA_APPS в реплику, запись — в основную.
+
+    Сессии и пользователи всегда читаются из основной базы: отставание
+    реплики не должно разлогинивать только что вошедшего пользователя.
+    Без базы replica в DATABASES роутер ничего не меняет.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (REPLICA in connections.databases
+                and not _use_primary.get()
+                and model._meta.app_label in settings.REPLICA_APPS):
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Обеспечивает чтение своих записей.
+
+    Изменяющие запросы целиком работают с основной базой и ставят cookie,
+    из-за которой следующие REPLICA_STICKY_SECONDS секунд пользователь
+    тоже читает из основной базы — например, видит только что созданную
+    заметку в списке, пока реплика не догнала основную базу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in ('GET', 'HEAD', 'OPTIONS')
+        if not writes and STICKY_COOKIE not in request.COOKIES:
+            return self.get_response(request)
+        with use_primary():
+            response = self.get_response(request)
+        if writes:
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response